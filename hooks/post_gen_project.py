@@ -7,29 +7,100 @@ cookiecutter hook after generation
 """
 
 
+from collections import namedtuple
 import fnmatch
 import os
+import shutil
 
 
 PROJECT_DIRECTORY = os.path.realpath(os.path.curdir)
 
 
-def remove_file(filepath):
-    os.remove(os.path.join(PROJECT_DIRECTORY, filepath))
+ANYWHERE = '**/'
 
 
-def find_files(directory, pattern):
-    """Generate file names matching pattern recursively found in directory."""
-    for root, dirs, files in os.walk(str(directory)):
-        for basename in files:
-            if fnmatch.fnmatch(basename, str(pattern)):
-                filename = os.path.join(root, basename)
-                yield filename
+Rule = namedtuple('Rule', 'variable keep_when patterns')
+"""
+Exclude files matching ``patterns`` unless ``variable`` is ``keep_when``.
+
+Patterns are matched against paths relative to the project root, unless
+they start with ``**/``: the rest of such a pattern is matched against
+base names anywhere in the tree.  Matching directories are removed as a
+whole.
+"""
 
 
-def find_files_in_patterns(directory, patterns):
+CONTEXT = {
+    'create_author_file': '{{ cookiecutter.create_author_file }}',
+    'use_flask': '{{ cookiecutter.use_flask }}',
+    'open_source': '{{ cookiecutter.project_license != "Not open source" }}',
+}
+
+
+PRUNING_RULES = [
+    Rule('create_author_file', 'y', ['AUTHORS.rst', 'docs/authors.rst']),
+    Rule('use_flask', 'y', ['**/*web.py']),
+    Rule('open_source', 'True', ['LICENSE']),
+]
+
+
+def excluded_patterns(rules, context):
+    """Collect patterns of all rules excluding files given the context."""
+    return [pattern
+            for rule in rules if context[rule.variable] != rule.keep_when
+            for pattern in rule.patterns]
+
+
+def prune(directory, patterns):
+    """
+    Remove everything matching any of the patterns in a single traversal.
+
+    Matching directories are removed without being descended into.
+
+    :param directory: Root of the tree to prune
+    :param patterns: Glob patterns as described by :class:`Rule`
+    :return: A list of the removed paths, relative to ``directory``
+    """
+    if not patterns:
+        return []
+
+    removed = []
+    pending = ['']
+    while pending:
+        relative_dir = pending.pop()
+        with os.scandir(os.path.join(directory, relative_dir)) as entries:
+            for entry in entries:
+                relative_path = os.path.join(relative_dir, entry.name)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if matches(relative_path, patterns):
+                    if is_dir:
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.remove(entry.path)
+                    removed.append(relative_path)
+                elif is_dir:
+                    pending.append(relative_path)
+    return sorted(removed)
+
+
+def matches(relative_path, patterns):
+    """Tell whether a path relative to the project root matches a pattern."""
+    posix_path = relative_path.replace(os.sep, '/')
+    name = posix_path.rsplit('/', 1)[-1]
     for pattern in patterns:
-        yield from find_files(directory, pattern)
+        if pattern.startswith(ANYWHERE):
+            if fnmatch.fnmatch(name, pattern[len(ANYWHERE):]):
+                return True
+        elif fnmatch.fnmatch(posix_path, pattern):
+            return True
+    return False
+
+
+def namespaced_path(namespace, source_dir):
+    """Provide where the source directory belongs given the namespace."""
+    if not namespace:
+        return source_dir
+    return os.path.join(*namespace.split('.'), source_dir)
 
 
 if __name__ == '__main__':
@@ -40,20 +111,11 @@ if __name__ == '__main__':
     os.makedirs(os.path.join(PROJECT_DIRECTORY, "docs", "_static"),
                 exist_ok=True)
 
-    if '{{ cookiecutter.create_author_file }}' != 'y':
-        remove_file('AUTHORS.rst')
-        remove_file('docs/authors.rst')
-
-    if '{{ cookiecutter.use_flask }}' != 'y':
-        flask_patterns = ['*web.py']
-        flask_files = find_files_in_patterns(PROJECT_DIRECTORY, flask_patterns)
-        for flask_file in flask_files:
-            remove_file(flask_file)
-
-    if 'Not open source' == '{{ cookiecutter.project_license }}':
-        remove_file('LICENSE')
+    for removed_path in prune(PROJECT_DIRECTORY,
+                              excluded_patterns(PRUNING_RULES, CONTEXT)):
+        print('Removed {!s}'.format(removed_path))
 
     if namespace:
-        parts = namespace.split(".")
-        os.makedirs(os.path.join(*parts), exist_ok=True)
-        os.rename(source_dir, os.path.join(*parts, source_dir))
+        destination = namespaced_path(namespace, source_dir)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.rename(source_dir, destination)
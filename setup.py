@@ -7,6 +7,8 @@
 
 from pathlib import Path
 import contextlib
+import hashlib
+import json
 import os
 import sys
 
@@ -14,9 +16,23 @@ from setuptools import Command, setup
 
 PROJECT_DIRECTORY = Path(__file__).parent.resolve()
 
+TEMPLATE_ENTRIES = ('cookiecutter.json', 'hooks',
+                    '{{cookiecutter.project_slug}}')
+
 
 class Cookiecutter(Command):
-    """Bake the cookies."""
+    """
+    Bake the cookies.
+
+    In incremental mode, the project is baked in a staging directory and
+    only outputs whose content changed are written to the build directory,
+    leaving others (and their modification times) untouched.  Outputs of a
+    previous bake which are not produced anymore are removed.  A manifest
+    of the template and context digests along with the digest of every
+    output is kept next to the baked project.  When baking without input,
+    the bake is skipped altogether if neither the template nor the context
+    changed since.
+    """
 
     description = 'bake the cookiecutter'
     user_options = [
@@ -25,14 +41,20 @@ class Cookiecutter(Command):
                            ' [default: False]'),
         ('replay', None, 'Do not prompt for parameters and only use '
                          'information entered previously '
-                         ' [default: letter]')
+                         ' [default: letter]'),
+        ('incremental', None, 'Only rewrite outputs that changed since the '
+                              'previous bake'
+                              ' [default: False]'),
     ]
 
+    manifest_name = '.cookiecutter-manifest.json'
+
     def initialize_options(self):
         """Set default values for options."""
         # Each user option must be listed here with their default value.
         self.no_input = False
         self.replay = False
+        self.incremental = False
 
     def finalize_options(self):
         """Post-process options."""
@@ -41,9 +63,110 @@ class Cookiecutter(Command):
     def run(self):
         """Run command."""
         from cookiecutter.main import cookiecutter
-        return cookiecutter('.', overwrite_if_exists=True, output_dir='build',
-                            no_input=self.no_input,
-                            replay=self.replay)
+        cache_directory = bytecode_cache_directory(PROJECT_DIRECTORY)
+        with jinja_bytecode_cache(cache_directory):
+            if self.incremental:
+                return self._incremental_bake()
+            return cookiecutter('.', overwrite_if_exists=True,
+                                output_dir='build',
+                                no_input=self.no_input,
+                                replay=self.replay)
+
+    def _incremental_bake(self):
+        import tempfile
+        from cookiecutter.main import cookiecutter
+
+        output_root = PROJECT_DIRECTORY / 'build'
+        output_root.mkdir(parents=True, exist_ok=True)
+        manifest_path = output_root / self.manifest_name
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            manifest = {}
+
+        template = template_digest(PROJECT_DIRECTORY)
+        context = self._context_digest()
+        if (context is not None and
+                manifest.get('template') == template and
+                manifest.get('context') == context and
+                Path(manifest.get('project', '')).is_dir()):
+            self.announce('Baked project is up to date', 2)
+            return manifest['project']
+
+        with tempfile.TemporaryDirectory(dir=str(output_root)) as staging:
+            staged = Path(cookiecutter('.', output_dir=staging,
+                                       no_input=self.no_input,
+                                       replay=self.replay))
+            project = output_root / staged.name
+            previous = (manifest.get('outputs', {})
+                        if manifest.get('project') == str(project) else {})
+            outputs = sync_tree(staged, project, previous,
+                                announce=self.announce)
+
+        manifest_path.write_text(json.dumps({'template': template,
+                                             'context': context,
+                                             'project': str(project),
+                                             'outputs': outputs},
+                                            indent=2, sort_keys=True))
+        return str(project)
+
+    def _context_digest(self):
+        # Prompted or replayed contexts are only known once baked
+        if not self.no_input or self.replay:
+            return None
+        from cookiecutter.config import get_user_config
+        digest = hashlib.sha256(
+            (PROJECT_DIRECTORY / 'cookiecutter.json').read_bytes())
+        default_context = get_user_config().get('default_context', {})
+        digest.update(json.dumps(default_context, sort_keys=True).encode())
+        return digest.hexdigest()
+
+
+class BatchCookiecutter(Command):
+    """
+    Bake one project per line of a JSON Lines file of extra contexts.
+
+    Each project is baked in its own numbered output directory by a pool of
+    worker processes.  See :func:`bake_batch`.
+    """
+
+    description = 'bake many cookies from a file of contexts'
+    user_options = [
+        ('contexts=', None, 'JSON Lines file holding one extra context '
+                            'per line'),
+        ('output-dir=', None, 'directory in which projects are baked'
+                              ' [default: build/batch]'),
+        ('jobs=', 'j', 'number of worker processes'
+                       ' [default: number of CPUs]'),
+    ]
+
+    def initialize_options(self):
+        """Set default values for options."""
+        # Each user option must be listed here with their default value.
+        self.contexts = None
+        self.output_dir = str(PROJECT_DIRECTORY / 'build' / 'batch')
+        self.jobs = None
+
+    def finalize_options(self):
+        """Post-process options."""
+        assert self.contexts, 'A file of contexts is required (--contexts)'
+        self.contexts = Path(str(self.contexts))
+        assert self.contexts.is_file(), \
+            'Contexts file {!s} does not exist.'.format(self.contexts)
+        self.output_dir = Path(str(self.output_dir))
+        if self.jobs is not None:
+            self.jobs = int(self.jobs)
+
+    def run(self):
+        """Run command."""
+        with self.contexts.open() as contexts_file:
+            extra_contexts = [json.loads(line)
+                              for line in contexts_file if line.strip()]
+        project_dirs = bake_batch(PROJECT_DIRECTORY, extra_contexts,
+                                  self.output_dir, jobs=self.jobs)
+        for project_dir in project_dirs:
+            self.announce('Baked {!s}'.format(project_dir), 2)
+        return project_dirs
 
 
 class Documentation(Command):
@@ -173,6 +296,7 @@ class BakedDocumentation(Command):
 
         baking_command = Cookiecutter(self.distribution)
         baking_command.no_input = True
+        baking_command.incremental = True
         bakedproject_directory = Path(baking_command.run())
         bakeddoc_build_directory = PROJECT_DIRECTORY / 'build' / 'baked-docs'
         bakeddoc_dist_directory = PROJECT_DIRECTORY / 'dist' / 'baked-docs'
@@ -191,30 +315,100 @@ class BakedDocumentation(Command):
 
 
 class Venv(Command):
-    """Setup venvs for development or production."""
+    """
+    Setup venvs for development or production.
+
+    Environments are keyed by a digest of the requirements they hold,
+    following ``-r`` includes, and of the interpreter version.  A matching
+    environment is reused as is.  Otherwise, an environment is cloned from
+    a cache shared by all projects, where it is first created, once per
+    key, by installing the requirements in a clone of a bare base
+    environment.  Clones are plain copies: pip rewrites files such as
+    ``*.dist-info`` records and ``.pth`` files in place, which would alter
+    every environment sharing them through hard links.
+    """
 
     description = 'create a virtualenv pre-installed with dependencies'
     user_options = [
         # The format is (long option, short option, description).
         ('deps=', None, 'path to requirements.txt'),
+        ('venv-dir=', None, 'directory of the virtualenv [default: .]'),
+        ('cache-dir=', None, 'directory of cached virtualenvs'
+                             ' [default: ~/.cache/cookiecutter-py/venvs]'),
+        ('wheelhouse=', None, 'install offline from this directory of'
+                              ' wheels'),
     ]
 
+    key_file = '.venv-key'
+
     def initialize_options(self):
         """Set default values for options."""
         # Each user option must be listed here with their default value.
         self.deps = './requirements.txt'
+        self.venv_dir = '.'
+        self.cache_dir = os.path.join(
+            os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+            'cookiecutter-py', 'venvs')
+        self.wheelhouse = None
 
     def finalize_options(self):
         """Post-process options."""
         if self.deps:
             deps = Path(str(self.deps))
             assert deps.exists(), \
-                ('Requirements file %s does not exist.'.format(deps))
+                ('Requirements file {!s} does not exist.'.format(deps))
+        self.venv_dir = Path(self.venv_dir).resolve()
+        self.cache_dir = Path(self.cache_dir)
 
     def run(self):
         """Run command."""
+        key = environment_key(self.deps)
+        key_path = self.venv_dir / self.key_file
+        if key_path.is_file() and key_path.read_text() == key:
+            self.announce('Reusing virtualenv {!s}'.format(self.venv_dir), 2)
+            return
+
+        cached = self.cache_dir / key
+        if not (cached / self.key_file).is_file():
+            self._provision(cached, key)
+
+        self.announce('Cloning virtualenv {!s}'.format(cached), 2)
+        remove_environment(self.venv_dir)
+        clone_environment(cached, self.venv_dir)
+
+    def _provision(self, environment, key):
+        import shutil
+        import subprocess
+
+        base = self._base_environment()
+        staging = environment.with_name(environment.name + '.tmp')
+        shutil.rmtree(str(staging), ignore_errors=True)
+        clone_environment(base, staging)
+
+        if self.deps:
+            self.announce('Installing {!s} in {!s}'.format(self.deps,
+                                                           environment), 2)
+            install = [str(environment_python(staging)), '-m', 'pip',
+                       'install', '--requirement', str(self.deps)]
+            if self.wheelhouse:
+                install.extend(['--no-index', '--find-links',
+                                str(self.wheelhouse)])
+            subprocess.check_call(install)
+
+        (staging / self.key_file).write_text(key)
+        shutil.rmtree(str(environment), ignore_errors=True)
+        clone_environment(staging, environment)
+        shutil.rmtree(str(staging), ignore_errors=True)
+
+    def _base_environment(self):
         import venv
-        venv.EnvBuilder(clear=True, with_pip=True).create('.')
+
+        base = self.cache_dir / 'base-{!s}'.format(
+            sys.implementation.cache_tag)
+        if not (base / 'pyvenv.cfg').is_file():
+            self.announce('Creating base virtualenv {!s}'.format(base), 2)
+            venv.EnvBuilder(clear=True, with_pip=True).create(str(base))
+        return base
 
 
 class Clean(Command):
@@ -252,6 +446,306 @@ def working_directory(path):
         os.chdir(str(prev_cwd))
 
 
+def file_digest(path) -> str:
+    """Hash the content of a file."""
+    digest = hashlib.sha256()
+    with open(str(path), 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def template_digest(template_directory) -> str:
+    """Hash the content of every file the template is made of."""
+    template_directory = Path(str(template_directory))
+    digest = hashlib.sha256()
+    for entry in TEMPLATE_ENTRIES:
+        path = template_directory / entry
+        files = [path] if path.is_file() else sorted(
+            child for child in path.rglob('*')
+            if child.is_file() and '__pycache__' not in child.parts)
+        for file in files:
+            digest.update(str(file.relative_to(template_directory)).encode())
+            digest.update(file_digest(file).encode())
+    return digest.hexdigest()
+
+
+def bytecode_cache_directory(template_directory) -> Path:
+    """
+    Provide the directory of compiled templates for the given template.
+
+    The directory is specific to the template's content and to the versions
+    of Jinja and cookiecutter compiling it, so that a stale cache is never
+    used.  Stale directories are simply left behind for the ``clean``
+    command.
+    """
+    import cookiecutter
+    import jinja2
+
+    digest = hashlib.sha256(template_digest(template_directory).encode())
+    digest.update(jinja2.__version__.encode())
+    digest.update(cookiecutter.__version__.encode())
+    return (Path(str(template_directory)) / 'build' / 'jinja-cache' /
+            digest.hexdigest()[:16])
+
+
+@contextlib.contextmanager
+def jinja_bytecode_cache(directory):
+    """
+    Cache templates compiled by cookiecutter on disk.
+
+    Every Jinja environment cookiecutter creates in this block is given a
+    :class:`jinja2.FileSystemBytecodeCache`, so that later bakes only pay
+    for rendering templates, not for compiling them.
+
+    :param directory: Directory where compiled templates are stored
+    """
+    from cookiecutter.environment import StrictEnvironment
+    from jinja2 import FileSystemBytecodeCache
+
+    directory = Path(str(directory))
+    directory.mkdir(parents=True, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(str(directory))
+    original_init = StrictEnvironment.__init__
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('bytecode_cache', bytecode_cache)
+        original_init(self, *args, **kwargs)
+
+    StrictEnvironment.__init__ = __init__
+    try:
+        yield bytecode_cache
+    finally:
+        StrictEnvironment.__init__ = original_init
+
+
+def sync_tree(source, destination, previous=None, announce=None) -> dict:
+    """
+    Make files of ``destination`` identical to those of ``source``.
+
+    Only files whose content differ are written.  Files listed in
+    ``previous`` but absent from ``source`` are removed, any other file
+    found in ``destination`` is left alone.
+
+    :param source: Directory to copy files from
+    :param destination: Directory to copy files to
+    :param previous: A mapping of relative paths to digests, as returned
+                     by a previous call
+    :param announce: Callable reporting changes, as
+                     :meth:`distutils.cmd.Command.announce`
+    :return: A mapping of relative paths to digests of all files in
+             ``source``
+    """
+    import shutil
+
+    source = Path(str(source))
+    destination = Path(str(destination))
+    previous = previous or {}
+    announce = announce or (lambda message, level: None)
+
+    outputs = {}
+    for path in sorted(source.rglob('*')):
+        if path.is_dir():
+            continue
+        relative = path.relative_to(source)
+        target = destination / relative
+        digest = file_digest(path)
+        outputs[relative.as_posix()] = digest
+
+        if target.is_file() and (previous.get(relative.as_posix()) == digest
+                                 or file_digest(target) == digest):
+            continue
+        announce('  updating {!s}'.format(relative), 2)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(str(path), str(target))
+        shutil.copymode(str(path), str(target))
+
+    for relative in set(previous) - set(outputs):
+        stale = destination / relative
+        if stale.is_file():
+            announce('  removing {!s}'.format(relative), 2)
+            stale.unlink()
+
+    return outputs
+
+
+def bake_batch(template, extra_contexts, output_dir, jobs=None):
+    """
+    Bake one project per extra context using a pool of processes.
+
+    Unlike calling :func:`cookiecutter.main.cookiecutter` once per project,
+    each worker reads the user configuration and the template's context
+    file only once and directly generates files from then on.  The project
+    for the n-th context is baked in the ``output_dir/<n>`` directory.
+
+    :param template: Directory of the cookiecutter template
+    :param extra_contexts: A list of extra contexts
+    :param output_dir: Directory in which projects are baked
+    :param jobs: Number of worker processes, defaults to the CPU count
+    :return: The list of baked project directories, in the same order as
+             ``extra_contexts``
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    template = str(Path(str(template)).resolve())
+    output_dir = Path(str(output_dir))
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=_init_batch_worker,
+                             initargs=(template,)) as pool:
+        futures = [pool.submit(_bake_batch_entry, extra_context,
+                               str(output_dir / '{:04d}'.format(index)))
+                   for index, extra_context in enumerate(extra_contexts)]
+        return [future.result() for future in futures]
+
+
+_batch_worker = {}
+
+
+def _init_batch_worker(template):
+    from cookiecutter.config import get_user_config
+
+    with open(os.path.join(template, 'cookiecutter.json')) as context_file:
+        template_context = json.load(context_file)
+    _batch_worker.update(
+        template=template,
+        template_context=template_context,
+        config=get_user_config(),
+        bytecode_cache_directory=bytecode_cache_directory(template))
+
+
+def _bake_batch_entry(extra_context, output_dir):
+    import copy
+    from cookiecutter.generate import (apply_overwrites_to_context,
+                                       generate_files)
+    from cookiecutter.prompt import prompt_for_config
+
+    template = _batch_worker['template']
+    cache_directory = _batch_worker['bytecode_cache_directory']
+    context = {
+        'cookiecutter': copy.deepcopy(_batch_worker['template_context'])}
+    apply_overwrites_to_context(context['cookiecutter'],
+                                _batch_worker['config']['default_context'])
+    apply_overwrites_to_context(context['cookiecutter'], extra_context)
+    context['cookiecutter'] = prompt_for_config(context, no_input=True)
+    context['cookiecutter']['_template'] = template
+    context['cookiecutter']['_output_dir'] = os.path.abspath(output_dir)
+
+    with jinja_bytecode_cache(cache_directory):
+        return generate_files(repo_dir=template, context=context,
+                              overwrite_if_exists=True, output_dir=output_dir)
+
+
+def environment_key(deps=None) -> str:
+    """
+    Hash what a virtualenv is made of.
+
+    :param deps: Path to a requirement file, if any
+    :return: A digest of the interpreter's version and of the requirements
+    """
+    import platform
+
+    digest = hashlib.sha256()
+    digest.update(sys.implementation.cache_tag.encode())
+    digest.update(platform.python_version().encode())
+    digest.update(os.path.realpath(sys.executable).encode())
+    if deps:
+        for requirement in sorted(read_requirements(deps)):
+            digest.update(requirement.encode() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+def read_requirements(path, seen=None) -> set:
+    """
+    Read requirements of a file, following its ``-r`` includes.
+
+    :param path: Path to the requirement file
+    :param seen: Files already read, which are never read again
+    :return: A set of requirement lines
+    """
+    path = Path(str(path)).resolve()
+    seen = set() if seen is None else seen
+    if path in seen:
+        return set()
+    seen.add(path)
+
+    requirements = set()
+    for line in path.read_text().splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        for option in ('--requirement', '-r'):
+            if line.startswith(option):
+                included = line[len(option):].lstrip(' =')
+                requirements |= read_requirements(path.parent / included,
+                                                  seen)
+                break
+        else:
+            requirements.add(line)
+    return requirements
+
+
+def environment_python(environment) -> Path:
+    """Provide the path to the interpreter of a virtualenv."""
+    if sys.platform == 'win32':
+        return Path(str(environment)) / 'Scripts' / 'python.exe'
+    return Path(str(environment)) / 'bin' / 'python'
+
+
+# Entries of a directory making up a virtualenv
+ENVIRONMENT_ENTRIES = ('pyvenv.cfg', 'bin', 'Scripts', 'include', 'Include',
+                       'lib', 'Lib', 'lib64', Venv.key_file)
+
+
+def remove_environment(directory):
+    """Remove a virtualenv, leaving other files of its directory alone."""
+    import shutil
+
+    for name in ENVIRONMENT_ENTRIES:
+        path = Path(str(directory)) / name
+        if path.is_symlink() or path.is_file():
+            path.unlink()
+        elif path.is_dir():
+            shutil.rmtree(str(path))
+
+
+def clone_environment(source, destination):
+    """
+    Copy a virtualenv.
+
+    Files are copied rather than hard linked, so that installing in the
+    clone never alters the source.  Scripts and configuration referring to
+    the source's location are rewritten to refer to the destination.
+    """
+    import shutil
+
+    source = Path(str(source)).resolve()
+    destination = Path(str(destination)).resolve()
+    destination.mkdir(parents=True, exist_ok=True)
+
+    for name in ENVIRONMENT_ENTRIES:
+        path = source / name
+        if path.is_dir() and not path.is_symlink():
+            shutil.copytree(str(path), str(destination / name),
+                            symlinks=True)
+        elif path.is_symlink():
+            os.symlink(os.readlink(str(path)), str(destination / name))
+        elif path.is_file():
+            shutil.copy2(str(path), str(destination / name))
+
+    old_prefix = str(source).encode()
+    new_prefix = str(destination).encode()
+    scripts = [destination / 'pyvenv.cfg']
+    for scripts_dir in ('bin', 'Scripts'):
+        if (destination / scripts_dir).is_dir():
+            scripts.extend((destination / scripts_dir).iterdir())
+    for script in scripts:
+        if script.is_symlink() or not script.is_file():
+            continue
+        content = script.read_bytes()
+        if old_prefix in content:
+            script.write_bytes(content.replace(old_prefix, new_prefix))
+
+
 def get_distribution_info():
     """Provide the keywords configurations for :func:`setuptools.setup`."""
     return dict(
@@ -270,6 +764,7 @@ def get_distribution_info():
                   'venv': Venv,
                   'clean': Clean,
                   'cookiecutter': Cookiecutter,
+                  'cookiecutter_batch': BatchCookiecutter,
                   'baked_docs': BakedDocumentation},
         classifiers=[
             'Development Status :: 4 - Beta',
@@ -18,11 +18,20 @@ on the subject.
 """
 
 
+from pathlib import Path
+import hashlib
+import json
 import os
 import importlib.util
+import shutil
+import stat
 from contextlib import contextmanager
 
 from cookiecutter.utils import rmtree
+from pytest_cookies.plugin import Result
+
+
+TEMPLATE_DIRECTORY = Path(__file__).resolve().parents[1]
 
 
 class BakedProject(object):
@@ -45,12 +54,7 @@ def baked_project(cookies, ctx):
     """
     result = cookies.bake(extra_context=ctx)
     module_path = os.path.join(str(result.project), 'setup.py')
-    module_name = 'setup'
-
-    spec = importlib.util.spec_from_file_location(module_name,
-                                                  module_path)
-    setup = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(setup)
+    setup = load_module('setup', module_path)
 
     try:
         project = BakedProject(ctx, result, setup)
@@ -60,6 +64,143 @@ def baked_project(cookies, ctx):
         rmtree(str(result.project))
 
 
+def load_module(module_name, module_path):
+    """
+    Load a python source file as a module, without importing it.
+
+    :param module_name: Name given to the loaded module
+    :param module_path: Path to the python source file
+    :return: The loaded module
+    """
+    spec = importlib.util.spec_from_file_location(module_name,
+                                                  str(module_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# The template's own setup script holds helpers shared with its commands
+template_setup = load_module('template_setup',
+                             TEMPLATE_DIRECTORY / 'setup.py')
+
+
+class BakeCache(object):
+    """
+    Content-addressed store of baked projects shared by a test session.
+
+    Each distinct extra context is baked once.  Later requests for the same
+    context get a clone made of hard links to the stored project (falling
+    back to plain copies across devices).  Stored files are made read-only
+    since they are shared by every clone: tests may add files to a clone
+    but must not rewrite the ones they were given.
+
+    Cache entries are keyed on a digest of the template tree and of the
+    normalized extra context, so editing the template while a session is
+    running never serves stale projects.
+    """
+
+    def __init__(self, root: Path, template: Path):
+        """
+        Initialize an empty cache.
+
+        :param root: Directory where baked projects will be stored
+        :param template: Directory of the cookiecutter template
+        """
+        self.root = Path(str(root))
+        self.template = Path(str(template))
+        self.hits = 0
+        self.misses = 0
+        self._stored = {}
+
+    def bake(self, cookies, clone_dir: Path, extra_context=None) -> Result:
+        """
+        Provide a private clone of the project baked from ``extra_context``.
+
+        :param cookies: pytest_cookies.Cookies used to bake on cache misses
+        :param clone_dir: Directory in which the clone will be created
+        :param extra_context: Cookiecutter extra context, as for
+                              ``cookies.bake``
+        :return: A result whose project is the clone
+        """
+        key = self.key(extra_context)
+        stored = self._stored.get(key)
+
+        if stored is None:
+            result = cookies.bake(extra_context=extra_context)
+            if result.exception is not None:
+                return result
+            self.misses += 1
+            stored = self._store(key, result)
+        else:
+            self.hits += 1
+
+        project_dir = Path(str(stored.project_path))
+        clone_dir = Path(str(clone_dir))
+        clone_dir.mkdir(parents=True, exist_ok=True)
+        clone = clone_dir / project_dir.name
+        shutil.copytree(str(project_dir), str(clone),
+                        copy_function=_link_or_copy)
+
+        return Result(exception=stored.exception,
+                      exit_code=stored.exit_code,
+                      project_dir=str(clone),
+                      context=stored.context)
+
+    def key(self, extra_context=None) -> str:
+        """Compute the cache key of a bake for the given extra context."""
+        normalized = json.dumps(extra_context or {}, sort_keys=True)
+        digest = hashlib.sha256(self.template_digest().encode())
+        digest.update(normalized.encode())
+        return digest.hexdigest()
+
+    def template_digest(self) -> str:
+        """Hash the content of every file the template is made of."""
+        return template_setup.template_digest(self.template)
+
+    def _store(self, key, result):
+        project_dir = Path(str(result.project_path))
+        stored_dir = self.root / key / project_dir.name
+        stored_dir.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(project_dir), str(stored_dir))
+        _make_read_only(stored_dir)
+
+        stored = Result(exception=result.exception,
+                        exit_code=result.exit_code,
+                        project_dir=str(stored_dir),
+                        context=result.context)
+        self._stored[key] = stored
+        return stored
+
+
+class CachedCookies(object):
+    """
+    Drop-in replacement of pytest_cookies.Cookies backed by a BakeCache.
+    """
+
+    def __init__(self, cookies, cache: BakeCache, clone_root: Path):
+        """
+        Wrap ``cookies`` so that it bakes through ``cache``.
+
+        :param cookies: pytest_cookies.Cookies of the current test
+        :param cache: The session's bake cache
+        :param clone_root: Directory where this test's clones are created
+        """
+        self._cookies = cookies
+        self._cache = cache
+        self._clone_root = Path(str(clone_root))
+        self._counter = 0
+
+    def bake(self, extra_context=None, template=None):
+        """Bake like pytest_cookies.Cookies.bake, serving from the cache."""
+        if template is not None:
+            return self._cookies.bake(extra_context=extra_context,
+                                      template=template)
+        clone_dir = self._clone_root / 'clone{:02d}'.format(self._counter)
+        self._counter += 1
+        return self._cache.bake(self._cookies, clone_dir,
+                                extra_context=extra_context)
+
+
 @contextmanager
 def _inside_dir(dirpath):
     """
@@ -84,6 +225,22 @@ def _inside_dir(dirpath):
         os.chdir(old_path)
 
 
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _make_read_only(directory):
+    read_only = ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    for root, dirs, files in os.walk(str(directory)):
+        for basename in files:
+            path = os.path.join(root, basename)
+            os.chmod(path, stat.S_IMODE(os.lstat(path).st_mode) & read_only)
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod(verbose=False, report=False)
@@ -0,0 +1,185 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Benchmark of the template bake.
+
+This times each phase of :func:`cookiecutter.main.cookiecutter`, the very
+function behind both ``cookies.bake`` and the ``cookiecutter`` command of
+our ``setup.py``:
+
+``pre_gen_project`` and ``post_gen_project``
+    Running the hooks.
+
+``render``
+    Rendering the template tree with Jinja, that is everything
+    :func:`cookiecutter.generate.generate_files` does besides running
+    hooks.
+
+``total``
+    Wall time of the whole bake, including context generation.
+
+Results are medians over a few rounds and may be stored as a JSON baseline
+against which later results are compared.
+
+Example usage:
+
+.. code-block::
+
+    >>> results = benchmark('.', {'trivial': {}}, work_dir='/tmp/bench')
+    >>> regressions(results, load_baseline('baseline.json'), tolerance=0.25)
+    []
+"""
+
+
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import statistics
+import time
+
+
+PHASES = ('total', 'render', 'pre_gen_project', 'post_gen_project')
+
+# Hook runner called by generate_files, depending on cookiecutter's version
+HOOK_RUNNERS = ('run_hook_from_repo_dir', '_run_hook_from_repo_dir')
+
+
+class BakeTimer(object):
+    """Accumulate time spent in each phase of bakes."""
+
+    def __init__(self):
+        """Start with no time spent in any phase."""
+        self.seconds = defaultdict(float)
+
+    @contextmanager
+    def timing(self):
+        """Patch cookiecutter to time the phases of bakes in this block."""
+        import cookiecutter.generate
+        import cookiecutter.main
+
+        generate_files = cookiecutter.main.generate_files
+        hook_runner_name = next(name for name in HOOK_RUNNERS
+                                if hasattr(cookiecutter.generate, name))
+        hook_runner = getattr(cookiecutter.generate, hook_runner_name)
+
+        def timed_generate_files(*args, **kwargs):
+            with self._timed('render'):
+                return generate_files(*args, **kwargs)
+
+        def timed_hook_runner(repo_dir, hook_name, *args, **kwargs):
+            with self._timed(hook_name):
+                return hook_runner(repo_dir, hook_name, *args, **kwargs)
+
+        cookiecutter.main.generate_files = timed_generate_files
+        setattr(cookiecutter.generate, hook_runner_name, timed_hook_runner)
+        try:
+            with self._timed('total'):
+                yield self
+        finally:
+            cookiecutter.main.generate_files = generate_files
+            setattr(cookiecutter.generate, hook_runner_name, hook_runner)
+        # Hooks run from within generate_files
+        self.seconds['render'] -= (self.seconds['pre_gen_project'] +
+                                   self.seconds['post_gen_project'])
+
+    @contextmanager
+    def _timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - start
+
+
+def time_bake(template, extra_context, output_dir, config_file) -> dict:
+    """
+    Bake once and time each phase.
+
+    :return: A mapping of phases to seconds
+    """
+    from cookiecutter.main import cookiecutter
+
+    timer = BakeTimer()
+    with timer.timing():
+        cookiecutter(str(template), no_input=True,
+                     extra_context=extra_context,
+                     output_dir=str(output_dir),
+                     config_file=str(config_file))
+    return {phase: timer.seconds[phase] for phase in PHASES}
+
+
+def benchmark(template, contexts, work_dir, rounds: int = 5) -> dict:
+    """
+    Time bakes of every context.
+
+    :param template: Directory of the cookiecutter template
+    :param contexts: A mapping of context identifiers to extra contexts
+    :param work_dir: Directory where projects are baked
+    :param rounds: Number of bakes per context
+    :return: A mapping of context identifiers to mappings of phases to
+             median seconds
+    """
+    work_dir = Path(str(work_dir))
+    config_file = work_dir / 'config.yaml'
+    work_dir.mkdir(parents=True, exist_ok=True)
+    config_file.write_text(
+        'cookiecutters_dir: "{!s}"\n'
+        'replay_dir: "{!s}"\n'.format(work_dir / 'cookiecutters',
+                                      work_dir / 'replay'))
+
+    results = {}
+    for context_id, context in contexts.items():
+        samples = [time_bake(template, context,
+                             work_dir / context_id / str(round_number),
+                             config_file)
+                   for round_number in range(rounds)]
+        results[context_id] = {
+            phase: statistics.median(sample[phase] for sample in samples)
+            for phase in PHASES}
+    return results
+
+
+def regressions(results, baseline, tolerance: float = 0.25,
+                min_seconds: float = 0.005):
+    """
+    Compare results to a baseline.
+
+    :param results: Results of :func:`benchmark`
+    :param baseline: Results of a previous run
+    :param tolerance: Accepted slowdown, relative to the baseline
+    :param min_seconds: Accepted slowdown in seconds, so that timer noise
+                        on very short phases is never reported
+    :return: A list of messages, one per regression
+    """
+    messages = []
+    for context_id, phases in sorted(results.items()):
+        for phase, seconds in sorted(phases.items()):
+            try:
+                reference = baseline[context_id][phase]
+            except KeyError:
+                continue
+            limit = max(reference * (1 + tolerance), reference + min_seconds)
+            if seconds > limit:
+                messages.append(
+                    '{!s} {!s}: {:.4f}s, baseline {:.4f}s (+{:.0%})'.format(
+                        context_id, phase, seconds, reference,
+                        seconds / reference - 1 if reference else 1))
+    return messages
+
+
+def load_baseline(path) -> dict:
+    """Read a baseline, which is empty if ``path`` does not exist."""
+    try:
+        return json.loads(Path(str(path)).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    """Store results as a baseline."""
+    path = Path(str(path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True))
@@ -0,0 +1,90 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Fixtures shared by the template tests.
+
+Projects are baked through a session-wide :class:`baked.BakeCache`, so each
+distinct context is rendered only once per test session whatever the
+number of tests using it.
+"""
+
+
+from pathlib import Path
+
+import pytest
+
+from baked import BakeCache, CachedCookies, template_setup
+from memory import MemoryCookies
+from venvs import VirtualenvPool
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('cookies')
+    group.addoption('--bake-jobs', action='store', type=int, default=None,
+                    dest='bake_jobs',
+                    help='bake the whole context matrix with this number '
+                         'of processes')
+    group.addoption('--bake-report', action='store', default=None,
+                    dest='bake_report',
+                    help='bake the whole context matrix and write its '
+                         'report as JSON to this file')
+    group.addoption('--wheelhouse', action='store', default=None,
+                    dest='wheelhouse',
+                    help='directory of wheels for offline installation of '
+                         'baked projects dependencies')
+    group.addoption('--bake-baseline', action='store', default=None,
+                    dest='bake_baseline',
+                    help='run the bake benchmark against this JSON '
+                         'baseline, e.g. .benchmarks/bake.json')
+    group.addoption('--bake-save-baseline', action='store_true',
+                    default=False, dest='bake_save_baseline',
+                    help='store the bake benchmark results as the baseline')
+    group.addoption('--bake-tolerance', action='store', type=float,
+                    default=0.25, dest='bake_tolerance',
+                    help='accepted bake slowdown relative to the baseline '
+                         '[default: 0.25]')
+    group.addoption('--bake-rounds', action='store', type=int, default=5,
+                    dest='bake_rounds',
+                    help='number of bakes per context in the benchmark '
+                         '[default: 5]')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def jinja_bytecode_cache(request):
+    """Share compiled templates with the cookiecutter setup command."""
+    template_dir = Path(request.config.option.template).resolve()
+    cache_dir = template_setup.bytecode_cache_directory(template_dir)
+    with template_setup.jinja_bytecode_cache(cache_dir) as bytecode_cache:
+        yield bytecode_cache
+
+
+@pytest.fixture(scope='session')
+def bake_cache(request, tmpdir_factory):
+    """Provide the bake cache shared by the whole test session."""
+    cache_dir = Path(str(tmpdir_factory.mktemp('bake-cache')))
+    template_dir = Path(request.config.option.template).resolve()
+    return BakeCache(cache_dir, template_dir)
+
+
+@pytest.fixture(scope='session')
+def memory_cookies(request):
+    """Bake projects in memory, for tests only reading baked files."""
+    return MemoryCookies(Path(request.config.option.template).resolve())
+
+
+@pytest.fixture
+def cookies(cookies, bake_cache, tmpdir):
+    """Override pytest-cookies' fixture to bake through the session cache."""
+    return CachedCookies(cookies, bake_cache, Path(str(tmpdir)) / 'clones')
+
+
+@pytest.fixture(scope='session')
+def venv_pool(request, tmpdir_factory):
+    """Provide the pool of virtualenvs shared by the whole test session."""
+    wheelhouse = request.config.option.wheelhouse
+    if not wheelhouse or not Path(wheelhouse).is_dir():
+        pytest.skip('installing baked projects requires --wheelhouse')
+    return VirtualenvPool(Path(str(tmpdir_factory.mktemp('venvs'))),
+                          Path(wheelhouse).resolve())
@@ -0,0 +1,232 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Parallel execution of the bake context matrix.
+
+Every combination of test context, license and flask flag is baked in its
+own worker process, each in an isolated temporary directory with its own
+cookiecutter configuration (hence its own replay directory).  Outcomes are
+merged into a single :class:`MatrixReport` exposing per-combination timings.
+
+Example usage:
+
+.. code-block::
+
+    >>> report = run_matrix('.', combinations(CONTEXTS), jobs=8)
+    >>> print(report)
+"""
+
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+TEMPLATE_DIRECTORY = Path(__file__).resolve().parents[1]
+
+LICENSE_STRINGS = {
+    'MIT license': 'MIT ',
+    'BSD license': 'Redistributions of source code must retain the above '
+                   'copyright notice, this',
+    'ISC license': 'ISC License',
+    'Apache Software License 2.0': 'Licensed under the Apache License, '
+                                   'Version 2.0',
+    'GNU General Public License v3': 'GNU GENERAL PUBLIC LICENSE',
+}
+
+
+class Combination(namedtuple('Combination',
+                             'context_id context license use_flask')):
+    """One cell of the bake matrix."""
+
+    @property
+    def id(self) -> str:
+        """Provide a short, unique and human-readable identifier."""
+        return '{!s}-{!s}-flask_{!s}'.format(
+            self.context_id,
+            self.license.lower().replace(' ', '_'),
+            self.use_flask)
+
+    @property
+    def extra_context(self) -> dict:
+        """Provide the extra context given to cookiecutter."""
+        extra_context = dict(self.context)
+        extra_context.update(project_license=self.license,
+                             use_flask=self.use_flask)
+        return extra_context
+
+
+Outcome = namedtuple('Outcome', 'combination seconds failures')
+
+
+class MatrixReport(object):
+    """Merged outcomes of a matrix run."""
+
+    def __init__(self, outcomes, seconds: float):
+        """
+        Merge outcomes.
+
+        :param outcomes: An iterable of :class:`Outcome`
+        :param seconds: Total wall time of the run
+        """
+        self.outcomes = sorted(outcomes, key=lambda o: o.combination.id)
+        self.seconds = seconds
+
+    @property
+    def failures(self) -> dict:
+        """Map failed combination identifiers to their failure messages."""
+        return {outcome.combination.id: outcome.failures
+                for outcome in self.outcomes if outcome.failures}
+
+    @property
+    def timings(self) -> dict:
+        """Map combination identifiers to their bake time in seconds."""
+        return {outcome.combination.id: outcome.seconds
+                for outcome in self.outcomes}
+
+    def as_dict(self) -> dict:
+        """Provide a JSON serializable representation."""
+        return {'seconds': self.seconds,
+                'timings': self.timings,
+                'failures': self.failures}
+
+    def dump(self, path):
+        """Write this report as JSON to ``path``."""
+        Path(str(path)).write_text(json.dumps(self.as_dict(), indent=2,
+                                              sort_keys=True))
+
+    def __str__(self):
+        """Provide a human-readable table of outcomes."""
+        lines = []
+        for outcome in self.outcomes:
+            lines.append('{!s:<60} {:>8.3f}s {!s}'.format(
+                outcome.combination.id,
+                outcome.seconds,
+                'FAILED' if outcome.failures else 'ok'))
+            lines.extend('    ' + failure for failure in outcome.failures)
+        lines.append('{:d} combinations, {:d} failed, {:.3f}s wall time'
+                     ''.format(len(self.outcomes), len(self.failures),
+                               self.seconds))
+        return '\n'.join(lines)
+
+
+def combinations(contexts, licenses=None, flask_flags=('y', 'n')):
+    """
+    Generate every combination of contexts, licenses and flask flags.
+
+    :param contexts: A mapping of context identifiers to extra contexts
+    :param licenses: License choices, defaults to those of cookiecutter.json
+    :param flask_flags: Values for the ``use_flask`` variable
+    """
+    if licenses is None:
+        licenses = template_choices('project_license')
+    for (context_id, context), license, use_flask in itertools.product(
+            contexts.items(), licenses, flask_flags):
+        yield Combination(context_id, context, license, use_flask)
+
+
+def template_choices(variable, template=TEMPLATE_DIRECTORY):
+    """Read the choices offered by cookiecutter.json for ``variable``."""
+    with open(str(Path(str(template)) / 'cookiecutter.json')) as json_file:
+        return json.load(json_file)[variable]
+
+
+def run_matrix(template, combinations, checks=None, jobs=None):
+    """
+    Bake and check all combinations using a pool of processes.
+
+    :param template: Directory of the cookiecutter template
+    :param combinations: An iterable of :class:`Combination`
+    :param checks: Callables taking a project path and a combination,
+                   returning a list of failure messages.  They must be
+                   picklable (module level functions).  Defaults to
+                   :data:`DEFAULT_CHECKS`.
+    :param jobs: Number of worker processes, defaults to the CPU count
+    :return: A :class:`MatrixReport`
+    """
+    checks = DEFAULT_CHECKS if checks is None else tuple(checks)
+    template = str(Path(str(template)).resolve())
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(bake_combination, template, combination,
+                               checks)
+                   for combination in combinations]
+        outcomes = [future.result() for future in futures]
+    return MatrixReport(outcomes, time.perf_counter() - start)
+
+
+def bake_combination(template, combination, checks):
+    """
+    Bake a single combination in an isolated directory and check it.
+
+    :return: An :class:`Outcome`
+    """
+    from cookiecutter.main import cookiecutter
+
+    work_dir = Path(tempfile.mkdtemp(prefix='bake-matrix-'))
+    failures = []
+    seconds = 0.0
+    try:
+        config_file = work_dir / 'config.yaml'
+        config_file.write_text(
+            'cookiecutters_dir: "{!s}"\n'
+            'replay_dir: "{!s}"\n'.format(work_dir / 'cookiecutters',
+                                          work_dir / 'replay'))
+        start = time.perf_counter()
+        try:
+            project_dir = cookiecutter(
+                template,
+                no_input=True,
+                extra_context=combination.extra_context,
+                output_dir=str(work_dir / 'output'),
+                config_file=str(config_file))
+        except (Exception, SystemExit) as error:
+            seconds = time.perf_counter() - start
+            failures.append('bake failed: {!r}'.format(error))
+        else:
+            seconds = time.perf_counter() - start
+            for check in checks:
+                failures.extend(check(Path(project_dir), combination))
+    finally:
+        shutil.rmtree(str(work_dir), ignore_errors=True)
+    return Outcome(combination, seconds, failures)
+
+
+def check_license(project_path, combination):
+    """The LICENSE file matches the selected license."""
+    license_path = project_path / 'LICENSE'
+    if combination.license not in LICENSE_STRINGS:
+        if license_path.exists():
+            return ['LICENSE found for {!r}'.format(combination.license)]
+        return []
+
+    failures = []
+    expected = LICENSE_STRINGS[combination.license]
+    if expected not in license_path.read_text():
+        failures.append('{!r} not in LICENSE'.format(expected))
+    if combination.license not in (project_path / 'setup.py').read_text():
+        failures.append('{!r} not in setup.py'.format(combination.license))
+    return failures
+
+
+def check_flask_sources(project_path, combination):
+    """Flask sources exist if and only if flask was selected."""
+    found = [os.path.relpath(os.path.join(root, basename), str(project_path))
+             for root, dirs, files in os.walk(str(project_path))
+             for basename in files if basename.endswith('web.py')]
+    if combination.use_flask == 'y' and not found:
+        return ['no flask sources found']
+    if combination.use_flask != 'y' and found:
+        return ['flask sources found: {!s}'.format(', '.join(found))]
+    return []
+
+
+DEFAULT_CHECKS = (check_license, check_flask_sources)
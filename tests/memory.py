@@ -0,0 +1,353 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+In-memory bake of the template, for tests only reading the baked project.
+
+:class:`MemoryCookies` renders the template the way
+:func:`cookiecutter.generate.generate_files` does, but into a
+:class:`VirtualTree` instead of the filesystem.  Hooks are rendered too:
+the pre generation hook runs as usual (it only validates the context)
+while the pruning rules and namespace layout of the post generation hook
+are applied to the virtual tree, using the very functions of the rendered
+hook.
+
+Baked projects are exposed through :class:`VirtualPath`, implementing the
+subset of :class:`py.path.local` used by our tests, so a result can be
+given to :class:`baked.BakedProject` like any other.
+
+Example usage:
+
+.. code-block::
+
+    >>> result = MemoryCookies('.').bake(extra_context={'namespace': ''})
+    >>> 'LICENSE' in [path.basename for path in result.project.listdir()]
+    True
+"""
+
+
+from pathlib import Path
+import fnmatch
+import os
+import posixpath
+
+
+class VirtualTree(object):
+    """Files and directories of a baked project, held in memory."""
+
+    def __init__(self, name: str):
+        """
+        Create an empty tree.
+
+        :param name: Name of the tree's root directory
+        """
+        self.name = name
+        self.files = {}
+        self.dirs = {''}
+
+    @property
+    def root(self):
+        """Provide the :class:`VirtualPath` of the root directory."""
+        return VirtualPath(self, '')
+
+    def add_dir(self, path: str):
+        """Add a directory, along with its parents."""
+        while path not in self.dirs:
+            self.dirs.add(path)
+            path = posixpath.dirname(path)
+
+    def add_file(self, path: str, content: bytes):
+        """Add a file, along with its parents."""
+        self.add_dir(posixpath.dirname(path))
+        self.files[path] = content
+
+    def remove(self, path: str):
+        """Remove a file, or a directory and everything it holds."""
+        prefix = path + '/'
+        self.files = {key: value for key, value in self.files.items()
+                      if key != path and not key.startswith(prefix)}
+        self.dirs = {key for key in self.dirs
+                     if key != path and not key.startswith(prefix)}
+        self.dirs.add('')
+
+    def move(self, source: str, destination: str):
+        """Move a file or directory, like :func:`os.rename`."""
+        def moved(key):
+            if key == source or key.startswith(source + '/'):
+                return destination + key[len(source):]
+            return key
+
+        self.files = {moved(key): value for key, value in self.files.items()}
+        dirs = {moved(key) for key in self.dirs}
+        self.dirs = {''}
+        for path in dirs:
+            self.add_dir(path)
+
+    def children(self, path: str):
+        """Provide names of a directory's direct children."""
+        prefix = path + '/' if path else ''
+        return sorted({key[len(prefix):].split('/', 1)[0]
+                       for key in list(self.files) + list(self.dirs)
+                       if key and key.startswith(prefix)})
+
+
+class VirtualPath(object):
+    """A path in a :class:`VirtualTree`, mimicking :class:`py.path.local`."""
+
+    def __init__(self, tree: VirtualTree, relative_path: str):
+        """
+        Refer to a path, which may not exist, in a tree.
+
+        :param tree: The tree
+        :param relative_path: A posix path relative to the tree's root
+        """
+        self.tree = tree
+        self.relative_path = relative_path
+
+    @property
+    def basename(self) -> str:
+        """Provide the last component of the path."""
+        return posixpath.basename(self.relative_path) or self.tree.name
+
+    def join(self, *parts):
+        """Provide a path below this one."""
+        relative_path = posixpath.normpath(
+            posixpath.join(self.relative_path, *[str(p) for p in parts]))
+        return VirtualPath(self.tree, '' if relative_path == '.'
+                           else relative_path)
+
+    __truediv__ = join
+
+    def isdir(self) -> bool:
+        """Tell whether this is an existing directory."""
+        return self.relative_path in self.tree.dirs
+
+    def isfile(self) -> bool:
+        """Tell whether this is an existing file."""
+        return self.relative_path in self.tree.files
+
+    def exists(self) -> bool:
+        """Tell whether this is an existing file or directory."""
+        return self.isfile() or self.isdir()
+
+    def check(self, file=None, dir=None, exists=None) -> bool:
+        """Check properties of this path, as :meth:`py.path.local.check`."""
+        checks = ((file, self.isfile), (dir, self.isdir),
+                  (exists, self.exists))
+        return all(bool(expected) == actual()
+                   for expected, actual in checks if expected is not None)
+
+    def read_binary(self) -> bytes:
+        """Provide the content of this file."""
+        try:
+            return self.tree.files[self.relative_path]
+        except KeyError:
+            raise FileNotFoundError(str(self)) from None
+
+    read_bytes = read_binary
+
+    def read_text(self, encoding='utf-8') -> str:
+        """Provide the decoded content of this file."""
+        return self.read_binary().decode(encoding)
+
+    def read(self, mode='r'):
+        """Provide the content of this file, as text unless in binary mode."""
+        if 'b' in mode:
+            return self.read_binary()
+        return self.read_text()
+
+    def listdir(self, fil=None):
+        """List this directory's children, optionally matching a glob."""
+        if not self.isdir():
+            raise NotADirectoryError(str(self))
+        children = self.tree.children(self.relative_path)
+        return [self.join(name) for name in children
+                if fil is None or fnmatch.fnmatch(name, fil)]
+
+    def visit(self, fil=None):
+        """Generate all paths below this one, optionally matching a glob."""
+        for child in self.listdir():
+            if fil is None or fnmatch.fnmatch(child.basename, fil):
+                yield child
+            if child.isdir():
+                yield from child.visit(fil)
+
+    def __str__(self):
+        """Provide a path that can never be mistaken for a real one."""
+        return posixpath.join('memory://', self.tree.name,
+                              self.relative_path).rstrip('/')
+
+    def __repr__(self):
+        """Provide a representation for debugging."""
+        return '<VirtualPath {!s}>'.format(self)
+
+    def __eq__(self, other):
+        """Compare paths of the same tree."""
+        return (isinstance(other, VirtualPath) and
+                other.tree is self.tree and
+                other.relative_path == self.relative_path)
+
+    def __hash__(self):
+        """Hash paths consistently with equality."""
+        return hash((id(self.tree), self.relative_path))
+
+
+class MemoryResult(object):
+    """Result of an in-memory bake, mimicking pytest_cookies.Result."""
+
+    def __init__(self, exception=None, exit_code=0, tree=None, context=None):
+        """Hold the outcome of a bake."""
+        self.exception = exception
+        self.exit_code = exit_code
+        self.tree = tree
+        self.context = context
+
+    @property
+    def project(self):
+        """Provide the baked project's root, if no exception occurred."""
+        if self.exception is None:
+            return self.tree.root
+        return None
+
+    project_path = project
+
+    def __repr__(self):
+        """Provide a representation for debugging."""
+        if self.exception:
+            return '<MemoryResult {!r}>'.format(self.exception)
+        return '<MemoryResult {!s}>'.format(self.project)
+
+
+class MemoryCookies(object):
+    """Bake projects in memory, like pytest_cookies.Cookies does on disk."""
+
+    def __init__(self, template):
+        """
+        Prepare baking from a template.
+
+        :param template: Directory of the cookiecutter template
+        """
+        self.template = Path(str(template)).resolve()
+
+    def bake(self, extra_context=None) -> MemoryResult:
+        """Bake a project in memory given an extra context."""
+        try:
+            context = self._context(extra_context or {})
+            tree = self._generate(context)
+        except SystemExit as error:
+            return MemoryResult(exception=error if error.code else None,
+                                exit_code=error.code)
+        except Exception as error:
+            return MemoryResult(exception=error, exit_code=-1)
+        return MemoryResult(tree=tree, context=context['cookiecutter'])
+
+    def _context(self, extra_context):
+        from cookiecutter.generate import generate_context
+        from cookiecutter.prompt import prompt_for_config
+
+        context = generate_context(
+            context_file=str(self.template / 'cookiecutter.json'),
+            extra_context=extra_context)
+        context['cookiecutter'] = prompt_for_config(context, no_input=True)
+        context['cookiecutter'].update(_template=str(self.template),
+                                       _output_dir='memory://',
+                                       _repo_dir=str(self.template),
+                                       _checkout=None)
+        return context
+
+    def _generate(self, context):
+        from cookiecutter.environment import StrictEnvironment
+        from cookiecutter.generate import is_copy_only_path
+        from binaryornot.check import is_binary
+        from jinja2 import FileSystemLoader
+
+        env = StrictEnvironment(
+            context=context, keep_trailing_newline=True,
+            **context['cookiecutter'].get('_jinja2_env_vars', {}))
+        template_dir = next(path for path in sorted(self.template.iterdir())
+                            if path.is_dir() and 'cookiecutter' in path.name
+                            and '{{' in path.name and '}}' in path.name)
+        env.loader = FileSystemLoader([str(template_dir),
+                                       str(template_dir.parent /
+                                           'templates')])
+
+        tree = VirtualTree(env.from_string(template_dir.name)
+                           .render(**context))
+        self._run_hook('pre_gen_project', env, context)
+
+        for root, dirs, files in os.walk(str(template_dir)):
+            dirs.sort()
+            relative_root = os.path.relpath(root, str(template_dir))
+            for name in dirs:
+                relative = os.path.normpath(os.path.join(relative_root,
+                                                         name))
+                tree.add_dir(self._render_path(env, context, relative))
+            for name in sorted(files):
+                infile = os.path.join(root, name)
+                relative = os.path.normpath(os.path.join(relative_root,
+                                                         name))
+                outfile = self._render_path(env, context, relative)
+                if not outfile or outfile in tree.dirs:
+                    continue
+                if (is_copy_only_path(relative, context) or
+                        is_binary(infile)):
+                    tree.add_file(outfile, Path(infile).read_bytes())
+                    continue
+                rendered = env.get_template(
+                    relative.replace(os.path.sep, '/')).render(**context)
+                tree.add_file(outfile, _with_newlines(
+                    rendered, infile, context).encode('utf-8'))
+
+        hook = self._run_hook('post_gen_project', env, context,
+                              __name__='post_gen_project')
+        if hook is not None:
+            _apply_post_gen_hook(hook, tree, context['cookiecutter'])
+        return tree
+
+    def _run_hook(self, hook_name, env, context, **namespace):
+        hook_path = self.template / 'hooks' / '{!s}.py'.format(hook_name)
+        if not hook_path.is_file():
+            return None
+        source = env.from_string(hook_path.read_text()).render(**context)
+        namespace.setdefault('__name__', '__main__')
+        namespace.setdefault('__file__', str(hook_path))
+        exec(compile(source, str(hook_path), 'exec'), namespace)
+        return namespace
+
+    @staticmethod
+    def _render_path(env, context, relative):
+        rendered = env.from_string(relative).render(**context)
+        return posixpath.normpath(rendered.replace(os.path.sep, '/'))
+
+
+def _with_newlines(rendered, infile, context):
+    """Use the newline of the template file, as cookiecutter does."""
+    newline = context['cookiecutter'].get('_new_lines')
+    if not newline:
+        with open(infile, encoding='utf-8') as template_file:
+            template_file.readline()
+        newline = template_file.newlines
+        if isinstance(newline, tuple):
+            newline = newline[0]
+    if newline and newline != '\n':
+        return rendered.replace('\n', newline)
+    return rendered
+
+
+def _apply_post_gen_hook(hook, tree, cookiecutter):
+    """Apply what the post generation hook does on disk to a tree."""
+    tree.add_dir('docs/_static')
+
+    patterns = hook['excluded_patterns'](hook['PRUNING_RULES'],
+                                         hook['CONTEXT'])
+    for path in sorted(tree.files) + sorted(tree.dirs):
+        if path and hook['matches'](path, patterns):
+            tree.remove(path)
+
+    source_dir = cookiecutter['project_slug']
+    destination = hook['namespaced_path'](cookiecutter['namespace'],
+                                          source_dir)
+    destination = destination.replace(os.path.sep, '/')
+    if destination != source_dir:
+        tree.move(source_dir, destination)
@@ -0,0 +1,128 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Streaming search of many words across the files of a baked project.
+
+A :class:`Scanner` compiles its words into a single Aho-Corasick automaton
+and reads every file once, in fixed size chunks, whatever the number of
+words.  Files are read as bytes so binary files are scanned too, and
+matches spanning two chunks are found since the automaton's state carries
+over from one chunk to the next.
+
+Example usage:
+
+.. code-block::
+
+    >>> scanner = Scanner(['flask', 'ripozo'])
+    >>> for hit in scanner.scan_tree('build/demo_cookie'):
+    ...     print(hit.path, hit.offset, hit.word)
+"""
+
+
+from collections import deque, namedtuple
+import os
+
+
+Hit = namedtuple('Hit', 'path offset word')
+"""A word found in a file, ``offset`` being that of the word's first byte."""
+
+
+class Scanner(object):
+    """Find occurrences of many words in a single pass over files."""
+
+    def __init__(self, words, ignore_case: bool = False, encoding='utf-8'):
+        """
+        Compile words into an automaton.
+
+        :param words: Words to search for, either strings or bytes
+        :param ignore_case: Whether to ignore the case of ASCII letters
+        :param encoding: Encoding of string words
+        """
+        self.ignore_case = ignore_case
+        words = [word if isinstance(word, bytes) else word.encode(encoding)
+                 for word in words]
+        if ignore_case:
+            words = [word.lower() for word in words]
+        self.words = sorted(set(words))
+        self._transitions, self._outputs = _compile(self.words)
+
+    def scan_file(self, path, chunk_size: int = 1 << 16):
+        """
+        Generate :class:`Hit` for every word found in a file.
+
+        :param path: Path to the file to scan
+        :param chunk_size: Number of bytes read at once
+        """
+        with open(str(path), 'rb') as scanned_file:
+            yield from self.scan_chunks(
+                path, iter(lambda: scanned_file.read(chunk_size), b''))
+
+    def scan_chunks(self, path, chunks):
+        """
+        Generate :class:`Hit` for every word found in consecutive chunks.
+
+        :param path: Path reported by hits, the chunks are not read from it
+        :param chunks: An iterable of bytes, making up the content scanned
+        """
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        position = 0
+        for chunk in chunks:
+            if self.ignore_case:
+                chunk = chunk.lower()
+            for byte in chunk:
+                state = transitions[state].get(byte, 0)
+                position += 1
+                for word in outputs[state]:
+                    yield Hit(str(path), position - len(word),
+                              word.decode('utf-8', 'replace'))
+
+    def scan_tree(self, directory, chunk_size: int = 1 << 16):
+        """Generate :class:`Hit` for every word found under ``directory``."""
+        for root, dirs, files in os.walk(str(directory)):
+            dirs.sort()
+            for basename in sorted(files):
+                yield from self.scan_file(os.path.join(root, basename),
+                                          chunk_size=chunk_size)
+
+
+def _compile(words):
+    """
+    Build the deterministic Aho-Corasick automaton of ``words``.
+
+    :return: A list of transitions (a mapping of byte to next state) and a
+             list of outputs (words ending at that state), both indexed by
+             state.  Bytes missing from transitions lead to state ``0``.
+    """
+    transitions = [{}]
+    outputs = [()]
+    for word in words:
+        if not word:
+            continue
+        state = 0
+        for byte in word:
+            if byte not in transitions[state]:
+                transitions.append({})
+                outputs.append(())
+                transitions[state][byte] = len(transitions) - 1
+            state = transitions[state][byte]
+        outputs[state] = outputs[state] + (word,)
+
+    # Breadth first, so that transitions of failure states (which are
+    # shallower) are already resolved when used
+    failures = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+    while queue:
+        state = queue.popleft()
+        for byte, next_state in list(transitions[state].items()):
+            queue.append(next_state)
+            failures[next_state] = transitions[failures[state]].get(byte, 0)
+            outputs[next_state] = (outputs[next_state] +
+                                   outputs[failures[next_state]])
+        # Resolve failures once, so that scanning never backtracks
+        for byte, next_state in transitions[failures[state]].items():
+            transitions[state].setdefault(byte, next_state)
+    return transitions, outputs
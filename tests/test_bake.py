@@ -6,21 +6,16 @@ from collections import OrderedDict
 from contextlib import contextmanager
 import copy
 import datetime
-import fnmatch
 import os
-import pip
 import pytest
 import subprocess
-import sys
 import shlex
 
 from cookiecutter.utils import rmtree
-from click.testing import CliRunner
 
-if sys.version_info > (3, 0):
-    import importlib
-else:
-    import imp
+from baked import TEMPLATE_DIRECTORY, load_module
+from matrix import LICENSE_STRINGS, combinations, run_matrix
+from scanner import Scanner
 
 
 CONTEXTS = OrderedDict(
@@ -38,23 +33,22 @@ def context(request):
     yield copy.copy(request.param)
 
 
-def test_bake_with_defaults(cookies, context):
+def test_bake_with_defaults(memory_cookies, context):
     """
     Project is a directory and contains some specific top level files.
 
-    :param cookies:
+    :param memory_cookies:
     :param context:
     :return:
     """
+    result = memory_cookies.bake(extra_context=context)
+    assert result.project.isdir()
+    assert result.exit_code == 0
+    assert result.exception is None
 
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
-        assert result.project.isdir()
-        assert result.exit_code == 0
-        assert result.exception is None
-
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert 'setup.py' in found_toplevel_files
-        assert 'tests' in found_toplevel_files
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert 'setup.py' in found_toplevel_files
+    assert 'tests' in found_toplevel_files
 
 
 def test_bake_and_run_tests(cookies, context):
@@ -83,152 +77,212 @@ def test_bake_and_check_style(cookies, context):
         run_inside_dir('python setup.py lint', str(result.project)) == 0
 
 
-def test_bake_without_author_file(cookies, context):
+def test_bake_without_author_file(memory_cookies, context):
     """
     Make sure no author file exists if specified in context
 
-    :param cookies:
+    :param memory_cookies:
     :param context:
     :return:
     """
     context.update({'create_author_file': 'n'})
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
+    result = memory_cookies.bake(extra_context=context)
 
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert 'AUTHORS.rst' not in found_toplevel_files
-        doc_files = [f.basename for f in result.project.join('docs').listdir()]
-        assert 'authors.rst' not in doc_files
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert 'AUTHORS.rst' not in found_toplevel_files
+    doc_files = [f.basename for f in result.project.join('docs').listdir()]
+    assert 'authors.rst' not in doc_files
 
-        # Assert there are no spaces in the toc tree
-        docs_index_path = result.project.join('docs/index.rst')
-        with open(str(docs_index_path)) as index_file:
-            assert 'contributing\n   history' in index_file.read()
+    # Assert there are no spaces in the toc tree
+    docs_index_path = result.project.join('docs/index.rst')
+    assert 'contributing\n   history' in docs_index_path.read()
 
-        # Check that
-        manifest_path = result.project.join('MANIFEST.in')
-        with open(str(manifest_path)) as manifest_file:
-            assert 'AUTHORS.rst' not in manifest_file.read()
+    # Check that
+    manifest_path = result.project.join('MANIFEST.in')
+    assert 'AUTHORS.rst' not in manifest_path.read()
 
 
-def test_bake_without_flask(cookies, context):
+def test_pruning_patterns_are_anchored_to_the_project_root():
+    """
+    Pruning patterns only match at the project root unless prefixed by
+    ``**/``
+
+    :return:
+    """
+    hook = load_module('post_gen_project',
+                       TEMPLATE_DIRECTORY / 'hooks' / 'post_gen_project.py')
+    patterns = ['AUTHORS.rst', 'docs/authors.rst', '**/*web.py', 'LICENSE']
+
+    assert hook.matches('AUTHORS.rst', patterns)
+    assert hook.matches(os.path.join('docs', 'authors.rst'), patterns)
+    assert hook.matches('LICENSE', patterns)
+    assert not hook.matches(os.path.join('docs', 'AUTHORS.rst'), patterns)
+    assert not hook.matches(os.path.join('slug', 'LICENSE'), patterns)
+    assert not hook.matches('authors.rst', patterns)
+
+    assert hook.matches(os.path.join('slug', 'web.py'), patterns)
+    assert hook.matches(os.path.join('tests', 'functional', 'test_web.py'),
+                        patterns)
+    assert not hook.matches(os.path.join('slug', 'webapp.py'), patterns)
+
+
+def test_bake_without_flask(memory_cookies, context):
     """
     Given known flask components, ensure none exists given context.
 
-    :param cookies:
+    :param memory_cookies:
     :param context:
     :return:
     """
     context.update({'use_flask': 'n'})
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
-        project_path, project_slug, project_package_dir = project_info(result,
-                                                                       context)
-        flask_source_files = ["web.py"]
-        flask_source_root = project_package_dir
-        found_source_files = list(find_files(flask_source_root,
-                                             flask_source_files))
-        assert not found_source_files, (
-            "Flask sources found : {!s}".format(found_source_files))
-
-        flask_test_files = ["functional/test_web.py"]
-        flask_test_root = os.path.join(flask_source_root, "tests")
-        found_test_files = list(find_files(flask_test_root,
-                                             flask_test_files))
-        assert not found_test_files, (
-            "Flask tests found : {!s}".format(found_test_files))
-
-        flask_doc_files = ["web*.rst"]
-        flask_doc_root = os.path.join(flask_source_root, "docs")
-        found_doc_files = list(find_files(flask_doc_root,
-                                             flask_doc_files))
-        assert not found_doc_files, (
-            "Flask sources found : {!s}".format(found_doc_files))
-
-        flask_words = ["flask"]
-        for generated_file in find_files(project_path, '*'):
-            content = open(generated_file).read()
-            assert all(word not in content for word in flask_words), (
-                "Flask vocabulary found : one of {!s} in {!s}"
-                "".format(", ".join(flask_words), generated_file))
-
-
-def test_bake_selecting_license(cookies, context):
-    license_strings = {
-        'MIT license': 'MIT ',
-        'BSD license': 'Redistributions of source code must retain the above copyright notice, this',
-        'ISC license': 'ISC License',
-        'Apache Software License 2.0': 'Licensed under the Apache License, Version 2.0',
-        'GNU General Public License v3': 'GNU GENERAL PUBLIC LICENSE',
-    }
-    for name, target_string in license_strings.items():
-        context['project_license'] = name
-        with bake_in_temp_dir(cookies, extra_context=context) as result:
-            assert target_string in result.project.join('LICENSE').read()
-            assert name in result.project.join('setup.py').read()
-
-
-def test_bake_not_open_source(cookies, context):
+    result = memory_cookies.bake(extra_context=context)
+    assert result.exception is None
+
+    flask_files = ["web.py", "test_web.py", "web*.rst"]
+    found_files = [str(path) for pattern in flask_files
+                   for path in result.project.visit(pattern)]
+    assert not found_files, (
+        "Flask files found : {!s}".format(", ".join(found_files)))
+
+    scanner = Scanner(["flask"])
+    found_words = [hit for path in result.project.visit()
+                   if path.check(file=1)
+                   for hit in scanner.scan_chunks(path,
+                                                  [path.read_binary()])]
+    assert not found_words, (
+        "Flask vocabulary found : {!s}".format(", ".join(
+            "{!s} in {!s} at {:d}".format(hit.word, hit.path, hit.offset)
+            for hit in found_words)))
+
+
+@pytest.mark.parametrize('license_name', sorted(LICENSE_STRINGS))
+def test_bake_selecting_license(memory_cookies, context, license_name):
+    target_string = LICENSE_STRINGS[license_name]
+    context['project_license'] = license_name
+    result = memory_cookies.bake(extra_context=context)
+    assert target_string in result.project.join('LICENSE').read()
+    assert license_name in result.project.join('setup.py').read()
+
+
+def test_bake_context_matrix(request):
+    """
+    Every context, license and flask flag combination bakes as expected.
+
+    Combinations are spread over a process pool, see the ``--bake-jobs`` and
+    ``--bake-report`` options.  The whole matrix is only baked when one of
+    them is given, since :func:`test_bake_selecting_license` and
+    :func:`test_bake_without_flask` already cover each choice.
+
+    :param request:
+    :return:
+    """
+    option = request.config.option
+    if option.bake_jobs is None and not option.bake_report:
+        pytest.skip('baking the whole context matrix requires --bake-jobs '
+                    'or --bake-report')
+    report = run_matrix(option.template, combinations(CONTEXTS),
+                        jobs=option.bake_jobs)
+    if option.bake_report:
+        report.dump(option.bake_report)
+    assert not report.failures, str(report)
+
+
+def test_bake_not_open_source(memory_cookies, context):
     context.update({'project_license': 'Not open source'})
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
-        found_toplevel_files = [f.basename for f in result.project.listdir()]
-        assert 'setup.py' in found_toplevel_files
-        assert 'LICENSE' not in found_toplevel_files
-        assert 'License' not in result.project.join('README.rst').read()
+    result = memory_cookies.bake(extra_context=context)
+    found_toplevel_files = [f.basename for f in result.project.listdir()]
+    assert 'setup.py' in found_toplevel_files
+    assert 'LICENSE' not in found_toplevel_files
+    assert 'License' not in result.project.join('README.rst').read()
 
 
-def test_bake_with_console_script_files(cookies, context):
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
-        project_path, project_slug, project_dir = project_info(result, context)
-        print(project_path, project_slug, project_dir)
-        found_project_files = os.listdir(project_dir)
-        assert "__main__.py" in found_project_files
-        assert "cli.py" in found_project_files
-        assert "greetings.py" in found_project_files
-
-        setup_path = os.path.join(project_path, 'setup.py')
-        with open(setup_path, 'r') as setup_file:
-            assert 'entry_points' in setup_file.read()
-
-
-@pytest.mark.skip(reason="could not import entry point that makes absolute "
-                         "imports with importlib")
-def test_bake_with_console_script_cli(cookies, context):
-    with bake_and_install(cookies) as result:
-        project_path, project_slug, project_dir = project_info(result, context)
-        module_path = os.path.join(project_dir, 'cli.py')
-        module_name = '.'.join([project_slug, 'cli'])
-        if sys.version_info >= (3, 5):
-            spec = importlib.util.spec_from_file_location(module_name,
-                                                          module_path)
-            cli = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(cli)
-        elif sys.version_info >= (3, 3):
-            file_loader = importlib.machinery.SourceFileLoader
-            cli = file_loader(module_name, module_path).load_module()
-        else:
-            cli = imp.load_source(module_name, module_path)
-        runner = CliRunner()
-        noarg_result = runner.invoke(cli.main)
-        assert noarg_result.exit_code == 0
-        noarg_output = ' '.join(['Replace this message by putting your code into',
-                                 project_slug])
-        assert noarg_output in noarg_result.output
-        help_result = runner.invoke(cli.main, ['--help'])
-        assert help_result.exit_code == 0
-        assert 'Show this message' in help_result.output
-
-
-def test_year_compute_in_license_file(cookies, context):
+def test_bake_with_console_script_files(memory_cookies, context):
+    result = memory_cookies.bake(extra_context=context)
+    package_name = result.context['package_name']
+    project_dir = result.project.join(*package_name.split('.'))
+    found_project_files = [f.basename for f in project_dir.listdir()]
+    assert "__main__.py" in found_project_files
+    assert "cli.py" in found_project_files
+    assert "greetings.py" in found_project_files
+
+    assert 'entry_points' in result.project.join('setup.py').read()
+
+
+def test_bake_with_console_script_cli(cookies, venv_pool, context):
+    """
+    The installed console script runs the command line interface
+
+    :param cookies:
+    :param venv_pool:
+    :param context:
+    :return:
+    """
+    with bake_and_install(cookies, venv_pool,
+                          extra_context=context) as (result, venv):
+        package_name = result.context["package_name"]
+        help_output = venv.output(venv.script(package_name), '--help')
+        assert package_name in help_output
+        assert 'Show this message' in help_output
+        assert 'greet' in help_output
+
+        greet_output = venv.output(venv.script(package_name),
+                                   'greet', 'World')
+        assert greet_output.strip() == 'Hello World!'
+
+        venv.run('-m', package_name, '--version')
+
+
+def test_year_compute_in_license_file(memory_cookies, context):
     """
     The LICENSE file at the root for generated project contains the
     current date
 
+    :param memory_cookies:
+    :return:
+    """
+    result = memory_cookies.bake(extra_context=context)
+    license_file_path = result.project.join('LICENSE')
+    now = datetime.datetime.now()
+    assert str(now.year) in license_file_path.read()
+
+
+def test_bake_in_memory_matches_bake_on_disk(cookies, memory_cookies,
+                                             context):
+    """
+    Baking in memory produces exactly the files baked on disk.
+
     :param cookies:
+    :param memory_cookies:
+    :param context:
     :return:
     """
-    with bake_in_temp_dir(cookies, extra_context=context) as result:
-        license_file_path = result.project.join('LICENSE')
-        now = datetime.datetime.now()
-        assert str(now.year) in license_file_path.read()
+    in_memory = memory_cookies.bake(extra_context=context)
+    with bake_in_temp_dir(cookies, extra_context=context) as on_disk:
+        on_disk_files = {
+            f.relto(on_disk.project).replace(os.path.sep, '/'): f.read('rb')
+            for f in on_disk.project.visit() if f.check(file=1)}
+        assert on_disk.project.basename == in_memory.project.basename
+        assert sorted(on_disk_files) == sorted(in_memory.tree.files)
+        assert on_disk_files == in_memory.tree.files
+
+
+def test_bake_cache_clones_are_independent(cookies, bake_cache, context):
+    """
+    Baking the same context twice renders once and yields separate clones.
+
+    :param cookies:
+    :param bake_cache:
+    :param context:
+    :return:
+    """
+    misses = bake_cache.misses
+    with bake_in_temp_dir(cookies, extra_context=context) as first:
+        with bake_in_temp_dir(cookies, extra_context=context) as second:
+            assert bake_cache.misses - misses <= 1
+            assert first.project != second.project
+            assert (first.project.join('setup.py').read() ==
+                    second.project.join('setup.py').read())
+        assert first.project.join('setup.py').check(file=1)
 
 
 def project_info(result, actual_context=None):
@@ -294,22 +348,20 @@ def bake_in_temp_dir(cookies, *args, **kwargs):
 
 
 @contextmanager
-def bake_and_install(cookie, *args, **kwargs):
+def bake_and_install(cookie, venv_pool, *args, **kwargs):
+    """
+    Bake a project and install it in a virtualenv leased from a pool
+
+    :param cookie: pytest_cookies.Cookies, cookie to be baked
+    :param venv_pool: venvs.VirtualenvPool providing the virtualenv
+    :return: The bake result and the virtualenv it is installed in
+    """
     actual_context = kwargs.get("extra_context", {})
     with bake_in_temp_dir(cookie, *args, **kwargs) as result:
         project_path, project_slug, project_dir = project_info(result, actual_context)
-        pip.main(['install', '--upgrade', '--editable', str(project_path)])
-        yield result
-        pip.main(['uninstall', project_slug])
-
-
-def find_files(directory, pattern):
-    """Generate file names matching pattern recursively found in directory."""
-    for root, dirs, files in os.walk(str(directory)):
-        for basename in files:
-            if fnmatch.fnmatch(basename, str(pattern)):
-                filename = os.path.join(root, basename)
-                yield filename
+        distribution_name = result.context["package_name"]
+        with venv_pool.lease(project_path, distribution_name) as venv:
+            yield result, venv
 
 
 def run_inside_dir(command, dirpath):
@@ -0,0 +1,43 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Benchmark of the template bake against a stored baseline.
+
+The benchmark only runs when a baseline file is given with
+``--bake-baseline``.  Baselines depend on the machine they were measured
+on, so they are not committed: store one with ``--bake-save-baseline``
+before changing the template, later runs fail whenever a phase is slower
+than the baseline by more than ``--bake-tolerance``::
+
+    $ py.test tests/test_benchmark.py --bake-baseline .benchmarks/bake.json \
+          --bake-save-baseline
+    $ py.test tests/test_benchmark.py --bake-baseline .benchmarks/bake.json
+"""
+
+
+import pytest
+
+from benchmark import (benchmark, load_baseline, regressions,
+                       save_baseline)
+from test_bake import CONTEXTS
+
+
+def test_bake_benchmark(request, tmpdir):
+    """Baking every context is not slower than the baseline"""
+    option = request.config.option
+    if not option.bake_baseline:
+        pytest.skip('benchmarking bakes requires --bake-baseline')
+    results = benchmark(option.template, CONTEXTS, str(tmpdir),
+                        rounds=option.bake_rounds)
+    for context_id, phases in sorted(results.items()):
+        print(context_id, ', '.join('{!s}={:.4f}s'.format(phase, seconds)
+                                    for phase, seconds in phases.items()))
+
+    if option.bake_save_baseline:
+        save_baseline(option.bake_baseline, results)
+
+    found = regressions(results, load_baseline(option.bake_baseline),
+                        tolerance=option.bake_tolerance)
+    assert not found, '\n'.join(found)
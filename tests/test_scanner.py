@@ -0,0 +1,89 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Tests for the streaming word scanner used on baked projects.
+"""
+
+
+import pytest
+
+from scanner import Hit, Scanner
+
+
+def hits(scanner, path, chunk_size=1 << 16):
+    """Provide ``(offset, word)`` of every hit in a file"""
+    return [(hit.offset, hit.word)
+            for hit in scanner.scan_file(path, chunk_size=chunk_size)]
+
+
+def test_scanner_reports_offsets(tmpdir):
+    """Offsets are those of the first byte of each word"""
+    scanned = tmpdir.join('scanned.txt')
+    scanned.write('import flask\nfrom ripozo import flask\n')
+    assert hits(Scanner(['flask', 'ripozo']), scanned) == [
+        (7, 'flask'), (18, 'ripozo'), (32, 'flask')]
+
+
+def test_scanner_finds_nothing_in_unrelated_files(tmpdir):
+    """Partial words are not reported"""
+    scanned = tmpdir.join('scanned.txt')
+    scanned.write('flas fask lask flas\n')
+    assert hits(Scanner(['flask']), scanned) == []
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 4, 5, 64])
+def test_scanner_finds_words_spanning_chunks(tmpdir, chunk_size):
+    """Words cut by chunk boundaries are found once"""
+    scanned = tmpdir.join('scanned.txt')
+    scanned.write('xxflaskxflask')
+    assert hits(Scanner(['flask']), scanned, chunk_size=chunk_size) == [
+        (2, 'flask'), (8, 'flask')]
+
+
+def test_scanner_finds_overlapping_and_nested_words(tmpdir):
+    """Every word ending at a position is reported, nested ones included"""
+    scanned = tmpdir.join('scanned.txt')
+    scanned.write('ushers')
+    assert sorted(hits(Scanner(['he', 'she', 'his', 'hers']), scanned)) == [
+        (1, 'she'), (2, 'he'), (2, 'hers')]
+
+    scanned.write('aaaa')
+    assert hits(Scanner(['aa']), scanned) == [(0, 'aa'), (1, 'aa'),
+                                              (2, 'aa')]
+
+
+def test_scanner_ignores_case_when_asked(tmpdir):
+    """Case of ASCII letters is only ignored when asked"""
+    scanned = tmpdir.join('scanned.txt')
+    scanned.write('Flask FLASK flask')
+    assert hits(Scanner(['Flask']), scanned) == [(0, 'Flask')]
+    assert hits(Scanner(['Flask'], ignore_case=True), scanned) == [
+        (0, 'flask'), (6, 'flask'), (12, 'flask')]
+
+
+def test_scanner_reads_binary_and_undecodable_files(tmpdir):
+    """Files are scanned as bytes, whatever their encoding"""
+    scanned = tmpdir.join('scanned.bin')
+    scanned.write_binary(b'\x00\xff\xfeflask\x89PNG\xe9t\xe9 t\xc3\xa9')
+    assert hits(Scanner(['flask', 'été'.encode('latin-1'), 'té']),
+                scanned) == [(3, 'flask'), (12, '\ufffdt\ufffd'),
+                             (16, 'té')]
+
+
+def test_scanner_scans_chunks_in_memory():
+    """Content need not come from a file, words may span chunks"""
+    found = list(Scanner(['flask']).scan_chunks('memory://x', [b'fl', b'ask']))
+    assert found == [Hit('memory://x', 0, 'flask')]
+
+
+def test_scanner_walks_trees_in_order(tmpdir):
+    """Trees are scanned file by file, files of a directory first"""
+    tmpdir.join('b.txt').write('flask')
+    tmpdir.join('a', 'z.txt').write('no match, then flask', ensure=True)
+    tmpdir.join('a', 'y.bin').write_binary(b'\x00flask')
+    found = list(Scanner(['flask']).scan_tree(tmpdir))
+    assert found == [Hit(str(tmpdir.join('b.txt')), 0, 'flask'),
+                     Hit(str(tmpdir.join('a', 'y.bin')), 1, 'flask'),
+                     Hit(str(tmpdir.join('a', 'z.txt')), 15, 'flask')]
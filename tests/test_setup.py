@@ -18,9 +18,15 @@ on the subject.
 """
 
 
+from distutils.errors import DistutilsFileError
+import hashlib
 import subprocess
 import shlex
 import sys
+import zipfile
+
+import pytest
+import setuptools
 
 from baked import baked_project
 
@@ -98,6 +104,208 @@ def test_project_metadata_supports_deep_packages(cookies):
         assert "alpha.beta.gamma.slug" in project_metadata.packages
 
 
+def test_project_metadata_skips_artifact_directories(cookies):
+    """
+    Packages are not looked for in build artifacts nor virtualenvs, and
+    new packages are found even though the package index was saved
+    """
+    with baked_project(cookies, {"project_slug": "slug",
+                                 "namespace": "ns"}) as project:
+        root = project.project_path
+        root.join("build", "lib", "ns").ensure(dir=True)
+        root.join(".tox", "py35", "lib").ensure(dir=True)
+        root.join("venv", "pyvenv.cfg").ensure()
+        root.join("venv", "lib").ensure(dir=True)
+        packages = project.setup_module.ProjectMetadata().packages
+        assert "ns.slug" in packages
+        assert not [name for name in packages
+                    if name.split(".")[0] in ("build", "venv", "lib")]
+
+        root.join("ns", "slug", "added").ensure(dir=True)
+        packages = project.setup_module.ProjectMetadata().packages
+        assert "ns.slug.added" in packages
+
+
+def test_project_metadata_commands_come_from_the_cli_module(cookies):
+    """Sub-commands are read from the package, without importing it"""
+    with baked_project(cookies, {"project_slug": "slug",
+                                 "namespace": "ns"}) as project:
+        project_metadata = project.setup_module.ProjectMetadata()
+        assert project_metadata.commands == {
+            "greet": "ns.slug.commands:greet"}
+        assert project_metadata.raw()["entry_points"]["ns.slug.commands"] == [
+            "greet=ns.slug.commands:greet"]
+
+
+def test_project_metadata_raw_does_not_write_a_snapshot(cookies):
+    """Computing metadata leaves no metadata snapshot behind"""
+    with baked_project(cookies, {}) as project:
+        setup = project.setup_module
+        setup.ProjectMetadata().raw()
+        assert not project.project_path.join(setup.METADATA_SNAPSHOT).check()
+
+
+def test_project_metadata_snapshot_survives_build_artifacts(cookies):
+    """
+    A snapshot stays valid when build artifacts or data files are created,
+    not when a package is added
+
+    Files of cached bakes are hard links to read-only files shared by the
+    whole session, so files are only ever created here, never modified.
+    """
+    with baked_project(cookies, {"project_slug": "slug",
+                                 "namespace": "ns"}) as project:
+        setup = project.setup_module
+        root = project.project_path
+        setup.ProjectMetadata().save_snapshot()
+        assert root.join(setup.METADATA_SNAPSHOT).check(file=1)
+
+        root.join("build", "lib", "ns").ensure(dir=True)
+        root.join("dist").ensure(dir=True)
+        root.join("ns", "slug", "messages.json").write("{}\n")
+        assert setup.ProjectMetadata().restore_snapshot()
+
+        root.join("ns", "slug", "added").ensure(dir=True)
+        project_metadata = setup.ProjectMetadata()
+        assert not project_metadata.restore_snapshot()
+        assert "ns.slug.added" in project_metadata.packages
+
+
+def test_clean_command_reports_failures_once_done(cookies, monkeypatch):
+    """Paths that could not be removed do not stop the others"""
+    with baked_project(cookies, {}) as project:
+        setup = project.setup_module
+        root = project.project_path
+        root.join("build", "lib", "module.py").ensure()
+        root.join("dist", "archive.tar.gz").ensure()
+        root.join("htmlcov", "index.html").ensure()
+        remove_path = setup.remove_path
+
+        def failing_remove_path(path):
+            if path.endswith("dist"):
+                raise PermissionError(13, "Permission denied", path)
+            return remove_path(path)
+
+        monkeypatch.setattr(setup, "remove_path", failing_remove_path)
+        command = setup.Clean(setuptools.Distribution())
+        command.ensure_finalized()
+        with pytest.raises(DistutilsFileError) as raised:
+            command.run()
+        assert "could not remove 1 paths" in str(raised.value)
+        assert "dist" in str(raised.value)
+        assert not root.join("build").check()
+        assert not root.join("htmlcov").check()
+        assert root.join("dist", "archive.tar.gz").check(file=1)
+
+
+def make_wheel(path, name, version, content=""):
+    """Write a minimal pure python wheel"""
+    dist_info = "{!s}-{!s}.dist-info".format(name, version)
+    with zipfile.ZipFile(str(path), "w") as wheel:
+        wheel.writestr("{!s}/__init__.py".format(name), content)
+        wheel.writestr(dist_info + "/METADATA",
+                       "Metadata-Version: 2.1\nName: {!s}\n"
+                       "Version: {!s}\n".format(name, version))
+        wheel.writestr(dist_info + "/WHEEL",
+                       "Wheel-Version: 1.0\nRoot-Is-Purelib: true\n"
+                       "Tag: py3-none-any\n")
+        wheel.writestr(dist_info + "/RECORD", "")
+    return path
+
+
+def test_lock_file_round_trip(cookies):
+    """Releases written to a lock file are read back as they were"""
+    with baked_project(cookies, {}) as project:
+        setup = project.setup_module
+        lock_file = project.project_path.join(setup.LOCK_FILE)
+        releases = {"click": ["6.7", ["sha256:bbbb", "sha256:aaaa"]],
+                    "zope-interface": ["4.4.3", ["sha256:cccc"]]}
+        setup.write_lock_file(str(lock_file), releases,
+                              project.project_path.join("requirements",
+                                                        "dev.txt"))
+        content = lock_file.read()
+        assert content.startswith("# Generated by")
+        assert "# Resolved from requirements/dev.txt\n" in content
+        assert ("click==6.7 \\\n"
+                "    --hash=sha256:aaaa \\\n"
+                "    --hash=sha256:bbbb\n") in content
+
+        assert setup.read_lock_file(str(lock_file)) == (
+            {"click": ["6.7", ["sha256:aaaa", "sha256:bbbb"]],
+             "zope-interface": ["4.4.3", ["sha256:cccc"]]},
+            setup.PROJECT_ROOT / "requirements" / "dev.txt")
+
+        setup.write_lock_file(str(lock_file), releases)
+        assert setup.read_lock_file(str(lock_file))[1] is None
+
+
+def test_requirement_files_are_resolved_once(cookies):
+    """Included requirement files are followed once, without duplicates"""
+    with baked_project(cookies, {}) as project:
+        requirements = project.project_path.join("requirements")
+        requirements.join("a.txt").write("-r b.txt\nclick  # cli\n"
+                                         "\n# comment\nflask\n")
+        requirements.join("b.txt").write("--requirement=a.txt\nclick\n")
+        resolved = project.setup_module.resolve_requirement_files(
+            str(requirements.join("a.txt")))
+        assert resolved == ["click", "flask"]
+
+
+def test_add_release_names_wheels_and_sources(cookies, tmpdir):
+    """Distribution files are hashed under their canonical name"""
+    with baked_project(cookies, {}) as project:
+        setup = project.setup_module
+        wheel = make_wheel(tmpdir.join("Tiny_Thing-1.0-py3-none-any.whl"),
+                           "Tiny_Thing", "1.0")
+        source = tmpdir.join("other.lib-2.0.tar.gz")
+        source.write("not really an archive")
+        releases = {}
+        setup.add_release(releases, str(wheel))
+        setup.add_release(releases, str(wheel))
+        setup.add_release(releases, str(source))
+        assert releases["tiny-thing"] == [
+            "1.0",
+            ["sha256:" + hashlib.sha256(wheel.read_binary()).hexdigest()]]
+        assert releases["other-lib"][0] == "2.0"
+
+        setup.add_release(releases, str(make_wheel(
+            tmpdir.join("unknown-3.0-py3-none-any.whl"), "unknown", "3.0")),
+            known_only=True)
+        assert "unknown" not in releases
+
+
+def test_wheelhouse_rejects_wheels_not_matching_the_lock_file(cookies, tmpdir,
+                                                              monkeypatch):
+    """
+    Wheels of the wheelhouse must match hashes of the lock file, which
+    keeps its source when rewritten
+    """
+    with baked_project(cookies, {}) as project:
+        setup = project.setup_module
+        monkeypatch.setenv("PIP_NO_INDEX", "1")
+        wheelhouse = tmpdir.join("wheelhouse").ensure(dir=True)
+        lock_file = tmpdir.join("requirements.lock")
+        wheel = make_wheel(wheelhouse.join("tiny-1.0-py3-none-any.whl"),
+                           "tiny", "1.0")
+        requirements = project.project_path.join("requirements", "dev.txt")
+        releases = {}
+        setup.add_release(releases, str(wheel))
+        setup.write_lock_file(str(lock_file), releases, requirements)
+        locked = (releases, setup.PROJECT_ROOT / "requirements" / "dev.txt")
+
+        command = setup.Wheelhouse(setuptools.Distribution())
+        command.lock_file = str(lock_file)
+        command.wheelhouse = str(wheelhouse)
+        command.ensure_finalized()
+        command.run()
+        assert setup.read_lock_file(str(lock_file)) == locked
+
+        make_wheel(wheel, "tiny", "1.0", content="tampered = True\n")
+        with pytest.raises(subprocess.CalledProcessError):
+            command.run()
+        assert setup.read_lock_file(str(lock_file)) == locked
+
+
 def test_docs_command(cookies):
     """
     Documentation should build without error
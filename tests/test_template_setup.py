@@ -0,0 +1,133 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Tests for the template's own setup.py script and its commands.
+"""
+
+
+import json
+import os
+import subprocess
+import sys
+
+from baked import TEMPLATE_DIRECTORY, template_setup
+
+
+def run_batch(tmpdir, contexts):
+    """
+    Run the batch bake command for some contexts
+
+    :param tmpdir: Directory holding the contexts file and the output
+    :param contexts: A list of extra contexts
+    :return: The exit status and the output directory
+    """
+    contexts_file = tmpdir.join('contexts.jsonl')
+    contexts_file.write('\n'.join(json.dumps(context)
+                                  for context in contexts) + '\n')
+    output_dir = tmpdir.join('batch')
+    status = subprocess.call(
+        [sys.executable, 'setup.py', '-q', 'cookiecutter_batch',
+         '--contexts', str(contexts_file), '--output-dir', str(output_dir),
+         '--jobs', '2'],
+        cwd=str(TEMPLATE_DIRECTORY),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return status, output_dir
+
+
+def test_bake_batch_bakes_every_context(tmpdir):
+    """Each context is baked in its own numbered output directory"""
+    status, output_dir = run_batch(tmpdir, [
+        {'project_slug': 'first', 'namespace': ''},
+        {'project_slug': 'second', 'namespace': 'ns'},
+    ])
+    assert status == 0
+    first = output_dir.join('0000', 'first')
+    second = output_dir.join('0001', 'second')
+    assert first.join('setup.py').check(file=1)
+    assert first.join('first', 'greetings.py').check(file=1)
+    assert second.join('setup.py').check(file=1)
+    assert second.join('ns', 'second', 'greetings.py').check(file=1)
+    assert not output_dir.join('0000', 'second').check()
+
+
+def test_bake_batch_fails_when_a_context_fails(tmpdir):
+    """A context failing its hooks fails the command, not the others"""
+    status, output_dir = run_batch(tmpdir, [
+        {'project_slug': 'fine', 'namespace': ''},
+        {'project_slug': 'not-valid', 'namespace': ''},
+    ])
+    assert status != 0
+    assert output_dir.join('0000', 'fine', 'setup.py').check(file=1)
+    assert not output_dir.join('0001', 'not-valid').check()
+
+
+def test_read_requirements_follows_includes(tmpdir):
+    """Included requirement files are read once, comments are ignored"""
+    tmpdir.join('base.txt').write('-r dev.txt\nclick  # cli\n\n# x\n')
+    tmpdir.join('dev.txt').write('--requirement=base.txt\npytest\nclick\n')
+    requirements = template_setup.read_requirements(tmpdir.join('base.txt'))
+    assert requirements == {'click', 'pytest'}
+
+
+def test_environment_key_depends_on_requirements_only(tmpdir):
+    """Environments are keyed by their requirements, whatever their order"""
+    first = tmpdir.join('first.txt')
+    first.write('click\npytest\n')
+    second = tmpdir.join('second.txt')
+    second.write('pytest\n-r other.txt\n')
+    tmpdir.join('other.txt').write('click\n')
+    assert (template_setup.environment_key(first) ==
+            template_setup.environment_key(second))
+    assert (template_setup.environment_key(first) !=
+            template_setup.environment_key())
+
+    first.write('click\npytest==3.0\n')
+    assert (template_setup.environment_key(first) !=
+            template_setup.environment_key(second))
+
+
+def make_environment(path):
+    """Lay out files as a virtualenv would, referring to its location"""
+    path.join('pyvenv.cfg').write('home = /usr/bin\n'
+                                  'command = venv {!s}\n'.format(path))
+    path.join('bin', 'activate').write('VIRTUAL_ENV="{!s}"\n'.format(path),
+                                       ensure=True)
+    path.join('bin', 'python').mksymlinkto('/usr/bin/python3')
+    site_packages = path.join('lib', 'python3', 'site-packages')
+    site_packages.join('demo-1.0.dist-info', 'RECORD').write('demo.py,,\n',
+                                                             ensure=True)
+    site_packages.join('demo.pth').write('/src/demo\n')
+    path.join('project.txt').write('not part of the environment')
+    return path
+
+
+def test_clone_environment_copies_files(tmpdir):
+    """Clones share no file with their source and refer to their location"""
+    source = make_environment(tmpdir.join('source').ensure(dir=True))
+    destination = tmpdir.join('destination')
+    template_setup.clone_environment(source, destination)
+
+    assert str(destination) in destination.join('pyvenv.cfg').read()
+    assert str(source) not in destination.join('bin', 'activate').read()
+    assert destination.join('bin', 'python').readlink() == '/usr/bin/python3'
+    assert not destination.join('project.txt').check()
+
+    site_packages = ('lib', 'python3', 'site-packages')
+    for relative in [('pyvenv.cfg',), site_packages + ('demo.pth',),
+                     site_packages + ('demo-1.0.dist-info', 'RECORD')]:
+        assert not os.path.samefile(str(source.join(*relative)),
+                                    str(destination.join(*relative)))
+
+    destination.join(*site_packages).join('demo.pth').write('/elsewhere\n')
+    assert source.join(*site_packages).join('demo.pth').read() == \
+        '/src/demo\n'
+
+
+def test_remove_environment_leaves_other_files(tmpdir):
+    """Only entries making up a virtualenv are removed"""
+    environment = make_environment(tmpdir.join('env').ensure(dir=True))
+    template_setup.remove_environment(environment)
+    assert [path.basename for path in environment.listdir()] == \
+        ['project.txt']
@@ -0,0 +1,163 @@
+#!/usr/bin/python3.5
+# coding: utf8
+
+
+"""
+Pool of reusable virtualenvs for tests installing baked projects.
+
+Creating a virtualenv and installing a baked project's dependencies in it
+is by far the slowest part of such tests.  A :class:`VirtualenvPool`
+provisions environments once with the content of the project's
+``requirements/_install.txt`` and ``requirements/_tests.txt``, installed
+offline from a local wheelhouse.  Tests lease an environment, install only
+the baked project in it (editable, without dependencies) and give it back
+once done.
+
+Environments are grouped by a digest of the requirements they were
+provisioned with, so projects baked from different contexts never share
+an environment that does not fit them.
+
+Example usage:
+
+.. code-block::
+
+    >>> pool = VirtualenvPool('/tmp/venvs', '/tmp/wheelhouse')
+    >>> with pool.lease(project_path, 'slug') as venv:
+    ...     venv.run('-m', 'slug', '--help')
+"""
+
+
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import itertools
+import subprocess
+import sys
+import threading
+import venv
+
+
+REQUIREMENT_FILES = ('requirements/_install.txt', 'requirements/_tests.txt')
+
+# Baked projects are installed without build isolation, which would
+# otherwise need an index to provision a build environment
+BUILD_REQUIREMENTS = ('setuptools', 'wheel')
+
+
+class Virtualenv(object):
+    """A virtualenv created by a :class:`VirtualenvPool`."""
+
+    def __init__(self, path: Path, wheelhouse: Path):
+        """
+        Refer to an existing virtualenv.
+
+        :param path: Root directory of the virtualenv
+        :param wheelhouse: Directory of wheels used for offline installs
+        """
+        self.path = Path(str(path))
+        self.wheelhouse = Path(str(wheelhouse))
+
+    @property
+    def python(self) -> Path:
+        """Provide the path to this environment's interpreter."""
+        if sys.platform == 'win32':
+            return self.path / 'Scripts' / 'python.exe'
+        return self.path / 'bin' / 'python'
+
+    def script(self, name: str) -> Path:
+        """Provide the path to a script installed in this environment."""
+        if sys.platform == 'win32':
+            return self.path / 'Scripts' / '{!s}.exe'.format(name)
+        return self.path / 'bin' / name
+
+    def run(self, *args, **kwargs):
+        """Run this environment's interpreter with the given arguments."""
+        command = [str(self.python)] + [str(arg) for arg in args]
+        return subprocess.check_call(command, **kwargs)
+
+    def output(self, executable, *args, **kwargs) -> str:
+        """Run an executable of this environment and return its output."""
+        command = [str(executable)] + [str(arg) for arg in args]
+        return subprocess.check_output(command, universal_newlines=True,
+                                       **kwargs)
+
+    def install(self, *args):
+        """Install packages offline from the wheelhouse."""
+        return self.run('-m', 'pip', 'install', '--quiet',
+                        '--no-index', '--find-links', self.wheelhouse,
+                        *args)
+
+    def uninstall(self, *names):
+        """Uninstall distributions by name."""
+        return self.run('-m', 'pip', 'uninstall', '--quiet', '--yes', *names)
+
+
+class VirtualenvPool(object):
+    """Provision, lend and recycle virtualenvs."""
+
+    def __init__(self, root, wheelhouse):
+        """
+        Initialize an empty pool.
+
+        :param root: Directory in which environments are created
+        :param wheelhouse: Directory of wheels used for offline installs
+        """
+        self.root = Path(str(root))
+        self.wheelhouse = Path(str(wheelhouse))
+        self._idle = defaultdict(list)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, project_path, distribution_name: str):
+        """
+        Lend an environment with ``project_path`` installed in it.
+
+        The baked project is installed in editable mode without its
+        dependencies, since the environment was provisioned with them.  It
+        is uninstalled before the environment goes back to the pool.
+
+        :param project_path: Directory of the baked project
+        :param distribution_name: Name of the project's distribution
+        """
+        project_path = Path(str(project_path))
+        key = requirements_digest(project_path)
+        environment = self._acquire(key, project_path)
+        environment.install('--no-deps', '--no-build-isolation',
+                            '--editable', project_path)
+        try:
+            yield environment
+        finally:
+            # An environment that failed to uninstall is never recycled
+            environment.uninstall(distribution_name)
+            with self._lock:
+                self._idle[key].append(environment)
+
+    def _acquire(self, key, project_path):
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop()
+            number = next(self._counter)
+        return self._provision(key, number, project_path)
+
+    def _provision(self, key, number, project_path):
+        path = self.root / '{!s}-{:02d}'.format(key[:12], number)
+        venv.EnvBuilder(with_pip=True).create(str(path))
+        environment = Virtualenv(path, self.wheelhouse)
+        requirements = list(BUILD_REQUIREMENTS)
+        for requirement_file in REQUIREMENT_FILES:
+            requirements.extend(['--requirement',
+                                 project_path / requirement_file])
+        environment.install(*requirements)
+        return environment
+
+
+def requirements_digest(project_path) -> str:
+    """Hash the requirement files environments are provisioned with."""
+    digest = hashlib.sha256()
+    for requirement_file in REQUIREMENT_FILES:
+        digest.update((Path(str(project_path)) / requirement_file)
+                      .read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
@@ -6,40 +6,70 @@
 
 
 from distutils.version import LooseVersion, Version
-from functools import lru_cache, reduce
+from functools import reduce
 from pathlib import Path
 from typing import List
+from setuptools.command.build_py import build_py
 import email.utils
 import fnmatch
+import hashlib
+import json
 import os
 import platform
+import posixpath
 import setuptools
 import shutil
 import urllib.parse
 
 __all__ = (
     'ProjectMetadata',
+    'BuildPy',
     'Clean',
 
     'Documentation',
+    'Lock',
+    'Wheelhouse',
 )
 
 
 PROJECT_ROOT = Path(__file__).parent
 
-PYTHON_VERSION = platform.python_version_tuple()
-
 DEFAULT_VERSION = '1.0'
 
+METADATA_SNAPSHOT = 'build/metadata.json'
+
+PACKAGE_INDEX = 'build/packages.json'
+
+LOCK_FILE = 'requirements.lock'
+
+LOCK_FILE_SOURCE = '# Resolved from'
+
+WHEELHOUSE = 'wheelhouse'
+
 
-def cached_property(f):
+class cached_property(object):
     """
     Annotate a class member to make it a cached property.
 
-    This is simply a combination of :func:`property` and :func:`lru_cache`
-    annotations merged together.
+    The value is computed once per instance and stored in the instance's
+    ``__dict__``, which then shadows this descriptor.  Unlike caching with
+    :func:`lru_cache`, this does not keep instances alive.  Delete the
+    attribute to invalidate the value (see
+    :meth:`ProjectMetadata.invalidate`).
     """
-    return property(lru_cache()(f))
+
+    def __init__(self, function):
+        """Wrap the function computing the value."""
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        """Compute the value and cache it in ``instance``."""
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.function(instance)
+        return value
 
 
 class ProjectMetadata(object):
@@ -56,9 +86,23 @@ class ProjectMetadata(object):
     <http://setuptools.readthedocs.io/en/latest/setuptools.html?highlight=keywords#new-and-changed-setup-keywords>`.
     """
 
-    def __init__(self):
-        """Initialize some cached or internal storage of data."""
+    snapshot_properties = ('name', 'description', 'version', 'url',
+                           'license', 'author', 'author_email',
+                           'classifiers', 'packages', 'install_requires',
+                           'tests_require', 'commands')
+
+    def __init__(self, use_snapshot: bool = True):
+        """
+        Initialize some cached or internal storage of data.
+
+        :param use_snapshot: Whether :meth:`raw` may reuse metadata
+                             computed by a previous run (see
+                             :meth:`restore_snapshot`)
+        """
         self._version = None
+        self._raw = None
+        self._restored = False
+        self.use_snapshot = use_snapshot
 
     @cached_property
     def name(self) -> str:
@@ -209,13 +253,10 @@ class ProjectMetadata(object):
 
         :return: A list of strings
         """
-        if PYTHON_VERSION < ('3', '3'):
-            find_packages = setuptools.find_packages
-        else:
-            find_packages = setuptools.PEP420PackageFinder.find
-        value = find_packages(str(PROJECT_ROOT), exclude=['docs*',
-                                                          'test*',
-                                                          'requirements'])
+        value = self.package_index.packages(exclude=['docs*',
+                                                     'test*',
+                                                     'requirements',
+                                                     WHEELHOUSE])
         return [self._ensure_short_string(package) for package in value]
 
     @cached_property
@@ -248,11 +289,57 @@ class ProjectMetadata(object):
         """
         return list_from_file('requirements/_tests.txt')
 
+    @cached_property
+    def commands(self) -> dict:
+        """
+        Sub-commands of the command line interface.
+
+        They are declared by the ``COMMANDS`` literal of the package's
+        ``cli`` module, read here without importing it.  They are
+        registered as entry points of the ``<name>.commands`` group, so
+        that the command line imports a command's module only when that
+        command runs.  Other distributions may register commands in the
+        same group.
+
+        :return: A mapping of command names to import paths
+        """
+        import ast
+
+        try:
+            tree = ast.parse(read_file(self.cli_module))
+        except OSError:
+            return {}
+        for node in tree.body:
+            if (isinstance(node, ast.Assign) and
+                    [getattr(target, 'id', None)
+                     for target in node.targets] == ['COMMANDS']):
+                return {name: self.name + import_path
+                        for name, import_path
+                        in ast.literal_eval(node.value).items()}
+        return {}
+
+    @cached_property
+    def cli_module(self) -> str:
+        """Path to the command line module, relative to the project."""
+        return posixpath.join(*self.name.split('.'), 'cli.py')
+
+    @cached_property
+    def package_index(self) -> 'PackageIndex':
+        """Index of the directories holding sources, see :attr:`packages`."""
+        return PackageIndex(PROJECT_ROOT, PROJECT_ROOT / PACKAGE_INDEX)
+
     def setup(self):
-        """Run :func:`setuptools.setup` using :func:~`raw`."""
-        return setuptools.setup(**self.raw())
+        """
+        Run :func:`setuptools.setup` using :func:~`raw`.
+
+        Metadata is stored for later runs unless it was restored from a
+        previous one, see :meth:`save_snapshot`.
+        """
+        raw = self.raw()
+        if self.use_snapshot and not self._restored:
+            self.save_snapshot()
+        return setuptools.setup(**raw)
 
-    @lru_cache()
     def raw(self) -> dict:
         """
         Create a generic dict representation.
@@ -261,32 +348,127 @@ class ProjectMetadata(object):
         primitives, exactly the same one would provide to
         :func:`setuptools.setup`
         """
-        return dict(name=str(self.name),
-                    version=str(self.version),
-                    description=str(self.description),
-                    url=str(self.url),
-                    license=str(self.license),
-                    author=str(self.author),
-                    author_email=str(self.author_email),
-                    classifiers=[str(item)
-                                 for item in self.classifiers],
-                    packages=[str(item) for item in self.packages],
-                    include_package_data=True,
-                    entry_points={
-                        'console_scripts': [
-                            '{module!s}={module!s}.cli:main'.format(
-                                module=self.name)
-                        ]
-                    },
-                    cmdclass={'docs': Documentation,
-                              'clean': Clean},
-                    install_requires=self.install_requires,
-                    tests_require=self.tests_require,
-                    setup_requires=['pbr>=1.9',
-                                    'setuptools>=17.1',
-                                    'flake8',
-                                    'pytest-runner',
-                                    'pytest'])
+        if self._raw is not None:
+            return self._raw
+
+        self._restored = self.use_snapshot and self.restore_snapshot()
+        self._raw = dict(name=str(self.name),
+                         version=str(self.version),
+                         description=str(self.description),
+                         url=str(self.url),
+                         license=str(self.license),
+                         author=str(self.author),
+                         author_email=str(self.author_email),
+                         classifiers=[str(item)
+                                      for item in self.classifiers],
+                         packages=[str(item) for item in self.packages],
+                         include_package_data=True,
+                         entry_points={
+                             'console_scripts': [
+                                 '{module!s}={module!s}.cli:main'.format(
+                                     module=self.name)
+                             ],
+                             '{module!s}.commands'.format(
+                                 module=self.name): [
+                                 '{!s}={!s}'.format(command, import_path)
+                                 for command, import_path
+                                 in sorted(self.commands.items())
+                             ]
+                         },
+                         cmdclass={'build_py': BuildPy,
+                                   'docs': Documentation,
+                                   'clean': Clean,
+                                   'lock': Lock,
+                                   'wheelhouse': Wheelhouse},
+                         install_requires=self.install_requires,
+                         tests_require=self.tests_require,
+                         setup_requires=['pbr>=1.9',
+                                         'setuptools>=17.1',
+                                         'flake8',
+                                         'pytest-runner',
+                                         'pytest'])
+        return self._raw
+
+    def invalidate(self, *names):
+        """
+        Forget cached values so that they are computed again.
+
+        :param names: Names of the properties to forget, all of them if
+                      none is given
+        """
+        names = names or [name for name in dir(type(self))
+                          if isinstance(getattr(type(self), name),
+                                        cached_property)]
+        for name in names:
+            self.__dict__.pop(name, None)
+            if name == 'version':
+                self._version = None
+        self._raw = None
+        self._restored = False
+
+    def restore_snapshot(self) -> bool:
+        """
+        Reuse metadata stored by a previous run, if it is still valid.
+
+        A snapshot is valid as long as the setup script and configuration,
+        the ``VERSION`` file, the requirement files, the command line module
+        and the directories of the package tree are unchanged, see
+        :meth:`fingerprint`.
+
+        :return: Whether the snapshot was restored
+        """
+        try:
+            snapshot = json.loads(read_file(METADATA_SNAPSHOT))
+        except (OSError, ValueError):
+            return False
+        if snapshot.get('fingerprint') != self.fingerprint():
+            return False
+
+        values = snapshot['values']
+        self._version = LooseVersion(values['version'])
+        values['version'] = self._version
+        for name in self.snapshot_properties:
+            self.__dict__[name] = values[name]
+        return True
+
+    def save_snapshot(self):
+        """Store metadata for later runs, see :meth:`restore_snapshot`."""
+        values = {name: getattr(self, name)
+                  for name in self.snapshot_properties}
+        values['version'] = str(values['version'])
+        snapshot = {'fingerprint': self.fingerprint(), 'values': values}
+        snapshot_path = PROJECT_ROOT / METADATA_SNAPSHOT
+        try:
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            snapshot_path.write_text(json.dumps(snapshot, indent=2))
+        except OSError:
+            pass
+
+    def fingerprint(self) -> str:
+        """
+        Hash everything the metadata is computed from.
+
+        Only the names of the package tree's directories are hashed, not
+        their modification times, so that creating build artifacts or
+        editing modules keeps the snapshot valid.  Artifact directories
+        such as ``build`` are not part of the tree, see
+        :meth:`PackageIndex.is_pruned`.
+        """
+        digest = hashlib.sha256()
+        digest.update(platform.python_version().encode())
+        digest.update(os.getenv('_VERSION', '').encode())
+        sources = [Path(__file__).resolve(), PROJECT_ROOT / 'setup.cfg',
+                   PROJECT_ROOT / 'VERSION', PROJECT_ROOT / self.cli_module]
+        sources.extend(sorted((PROJECT_ROOT / 'requirements').glob('*')))
+        for source in sources:
+            digest.update(str(source).encode())
+            try:
+                digest.update(source.read_bytes())
+            except OSError:
+                digest.update(b'-')
+        for directory, _ in self.package_index.directories():
+            digest.update('{!s}\0'.format(directory).encode())
+        return digest.hexdigest()
 
     def __str__(self):
         """Provide a human-readable representation."""
@@ -320,32 +502,114 @@ class ProjectMetadata(object):
         return string
 
 
+class BuildPy(build_py):
+    """
+    Build python modules, along with a frozen ``_metadata`` module.
+
+    The package imports its version from this module rather than looking
+    for its distribution at runtime, which is costly.  Since editable
+    checkouts are not built, the package falls back to
+    :mod:`importlib.metadata` in that case.
+    """
+
+    def run(self):
+        """Run command."""
+        super().run()
+        if self.dry_run:
+            return
+        raw = ProjectMetadata().raw()
+        module_path = Path(self.build_lib, *raw['name'].split('.'),
+                           '_metadata.py')
+        module_path.parent.mkdir(parents=True, exist_ok=True)
+        module_path.write_text(metadata_module(raw))
+        self.announce('writing {!s}'.format(module_path), 2)
+
+
+def metadata_module(raw) -> str:
+    """
+    Provide the source of a module holding distribution metadata.
+
+    :param raw: Metadata, as provided by :meth:`ProjectMetadata.raw`
+    """
+    return '\n'.join([
+        '# coding: utf8',
+        '',
+        '',
+        '"""Distribution metadata, frozen by setup.py at build time."""',
+        '',
+        '',
+        'project = {!r}'.format(raw['name']),
+        'version = {!r}'.format(raw['version']),
+        'entry_points = {!r}'.format(raw['entry_points']),
+        '',
+    ])
+
+
 class Clean(setuptools.Command):
-    """Custom clean command to tidy up the project."""
+    """
+    Custom clean command to tidy up the project.
+
+    The project is traversed once, matching both files and directories
+    against :attr:`default_patterns`.  Matching directories are not
+    descended into, nor are other hidden directories and virtualenvs.
+    Matching paths are then removed by a pool of threads.  Paths that
+    could not be removed do not stop the others from being removed, they
+    are all reported once done.
+    """
 
     description = 'Custom clean command to tidy up the project.'
-    user_options = []
+    user_options = [
+        ('dry-run', None, 'list what would be removed, without removing it'),
+        ('jobs=', 'j', 'number of threads removing files [default: 8]'),
+    ]
+    boolean_options = ['dry-run']
     default_patterns = ['build',  'dist', '*.egg-info', '*.egg', '*.pyc',
                         '*.pyo', '*~', '__pycache__', '.tox', '.coverage',
                         'htmlcov']
 
     def initialize_options(self):
         """Set default values for options."""
-        pass
+        self.dry_run = None
+        self.jobs = 8
 
     def finalize_options(self):
         """Post-process options."""
-        pass
+        if self.dry_run is None:
+            self.dry_run = self.distribution.dry_run
+        self.jobs = int(self.jobs)
+        assert self.jobs > 0
 
     def run(self):
         """Run command."""
-        for pattern in self.default_patterns:
-            self._remove_matching_files(pattern)
+        from concurrent.futures import ThreadPoolExecutor
+        from distutils.errors import DistutilsFileError
 
-    def _remove_matching_files(self, pattern):
-        for path in find_files(pattern):
-            self.announce('Cleaning path {!s}'.format(path), 2)
-            shutil.rmtree(path, ignore_errors=True)
+        paths = list(find_matching_paths(str(PROJECT_ROOT),
+                                         self.default_patterns))
+        remove = disk_usage if self.dry_run else remove_path
+
+        def attempt(path):
+            try:
+                return remove(path), None
+            except OSError as error:
+                return 0, error
+
+        failures = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            reclaimed = 0
+            for path, (size, error) in zip(paths, pool.map(attempt, paths)):
+                if error is not None:
+                    failures.append('{!s}: {!s}'.format(path, error))
+                    continue
+                self.announce('Cleaning path {!s}'.format(path), 2)
+                reclaimed += size
+        self.announce('{!s} {:d} paths, {:,d} bytes reclaimed'.format(
+            'Would remove' if self.dry_run else 'Removed',
+            len(paths) - len(failures), reclaimed), 2)
+        if failures:
+            raise DistutilsFileError(
+                'could not remove {:d} paths:\n  {!s}'.format(
+                    len(failures), '\n  '.join(failures)))
 
 
 class Documentation(setuptools.Command):
@@ -372,6 +636,8 @@ class Documentation(setuptools.Command):
                              ' [default: build/docs]'),
         ('src-dir=', None, 'documentation source directory'
                            ' [default: docs]'),
+        ('jobs=', 'j', 'number of processes Sphinx reads and writes with'
+                       ' [default: 1]'),
     ]
 
     targets = {
@@ -400,16 +666,19 @@ class Documentation(setuptools.Command):
         self.dist_dir = str(project_directory / 'dist' / 'docs')
         self.build_dir = str(project_directory / 'build' / 'docs')
         self.src_dir = str(project_directory / 'docs')
+        self.jobs = 1
 
     def finalize_options(self):
         """Post-process options."""
         if self.builder in self.targets:
             self._actual_targets = [self.builder]
         elif self.builder == 'all':
-            self._actual_targets = self.targets.keys()
+            self._actual_targets = sorted(self.targets)
         else:
             self._actual_targets = []
         assert self.paper in ['a4', 'letter']
+        self.jobs = int(self.jobs)
+        assert self.jobs > 0
         self._canonical_directories()
         self.announce(
             'Building {!s} documentation'.format(self.builder), 2)
@@ -421,11 +690,40 @@ class Documentation(setuptools.Command):
             '  distributing documentation at "{!s}"'.format(self.dist_root), 2)
 
     def run(self):
-        """Run command."""
-        result_dirs = {}
-        for target in self._actual_targets:
-            result_dirs[target] = self._build_doc(target)
-        for target, result_dir in result_dirs.items():
+        """
+        Run command.
+
+        Sources are read once, by the first target's build, into the
+        doctree cache.  Other targets are then built concurrently, each
+        from its own copy of that cache so that Sphinx only runs their
+        writers.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import shutil
+
+        if not self._actual_targets:
+            return
+
+        rst_src = self._build_source()
+        cached_directory = self.build_dir / 'doctrees'
+        first, *others = self._actual_targets
+
+        result_dirs = {first: self._build_doc(first, rst_src,
+                                              cached_directory)}
+        with ProcessPoolExecutor(max_workers=max(len(others), 1)) as pool:
+            builds = {}
+            for target in others:
+                target_cache = self.build_dir / 'doctrees-{!s}'.format(target)
+                shutil.rmtree(str(target_cache), ignore_errors=True)
+                shutil.copytree(str(cached_directory), str(target_cache))
+                builds[target] = pool.submit(
+                    build_sphinx,
+                    self._sphinx_opts(target, rst_src, target_cache))
+            for target, build in builds.items():
+                build.result()
+                result_dirs[target] = self._distribute(target)
+
+        for target, result_dir in sorted(result_dirs.items()):
             self.announce('Documentation target "{!s}" : {!s}'.format(
                 target,
                 self.targets[target]['comment'].format(
@@ -444,8 +742,22 @@ class Documentation(setuptools.Command):
         self.src_dir.resolve()
 
     def _build_source(self):
+        """
+        Generate API documentation pages in the documentation sources.
+
+        Pages are generated in a staging directory and copied over only
+        when their content differs, so Sphinx does not read unchanged
+        modules again.  Pages generated by a previous run but not by this
+        one are removed.  As with ``sphinx-apidoc`` run without
+        ``--force``, existing pages not generated by this command are
+        left alone.
+        """
+        import json
+        import shutil
         import sphinx.apidoc
         build_dir = self.src_dir
+        staging_dir = self.build_dir / 'apidoc'
+        manifest_path = self.build_dir / 'apidoc.json'
 
         # metadata contains information supplied in setup()
         metadata = self.distribution.metadata
@@ -458,7 +770,7 @@ class Documentation(setuptools.Command):
             '--module-first',   # Put module documentation before submodule
                                 # documentation
             '--doc-project', metadata.name,
-            '--output-dir', build_dir,
+            '--output-dir', staging_dir,
             '--maxdepth', 4,
             '--module-first',
             src_dir,
@@ -467,29 +779,50 @@ class Documentation(setuptools.Command):
 
         canonical_opts = [str(arg) for arg in sphinx_apidoc_opts]
 
+        shutil.rmtree(str(staging_dir), ignore_errors=True)
+        staging_dir.mkdir(parents=True)
         self.announce('  Invoking sphinx : '
                       '"{!s}"'.format(' '.join(canonical_opts)))
-        sphinx.apidoc.main([str(arg) for arg in sphinx_apidoc_opts])
+        sphinx.apidoc.main(canonical_opts)
+
+        try:
+            previous = set(json.loads(manifest_path.read_text()))
+        except (OSError, ValueError):
+            previous = set()
+        generated = set()
+        for staged in sorted(staging_dir.iterdir()):
+            page = build_dir / staged.name
+            if page.exists() and staged.name not in previous:
+                continue
+            generated.add(staged.name)
+            content = staged.read_bytes()
+            if not page.exists() or page.read_bytes() != content:
+                self.announce('  updating {!s}'.format(page), 2)
+                page.write_bytes(content)
+        for name in sorted(previous - generated):
+            page = build_dir / name
+            if page.exists():
+                self.announce('  removing {!s}'.format(page), 2)
+                page.unlink()
+        manifest_path.write_text(json.dumps(sorted(generated)))
 
         return build_dir
 
-    def _build_doc(self, target):
+    def _build_doc(self, target, rst_src, cached_directory):
+        build_sphinx(self._sphinx_opts(target, rst_src, cached_directory))
+        return self._distribute(target)
+
+    def _sphinx_opts(self, target, rst_src, cached_directory):
         from datetime import datetime
-        import shutil
-        import sphinx
 
-        rst_src = self._build_source()
         metadata = self.distribution.metadata
-
         build_dir = self.build_dir / target
-        dist_dir = self.dist_root / target
-
-        cached_directory = build_dir.parent / 'doctrees'
 
         all_sphinx_opts = [
             '',
             '-b', target,            # builder to use; default is html
             '-d', cached_directory,  # path for the cached doctree files
+            '-j', self.jobs,         # processes to read and write with
             '-n',                    # warn about all missing references
             '-q',                    # no output on stdout, warnings on stderr
             '-W',                    # turn warnings into errors
@@ -502,15 +835,329 @@ class Documentation(setuptools.Command):
             rst_src,
             build_dir
         ]
+        return [str(arg) for arg in all_sphinx_opts]
 
-        sphinx.build_main([str(arg) for arg in all_sphinx_opts])
+    def _distribute(self, target):
+        build_dir = self.build_dir / target
+        dist_dir = self.dist_root / target
 
-        shutil.rmtree(str(dist_dir), ignore_errors=True)
-        dist_dir.parent.mkdir(exist_ok=True, parents=True)
-        shutil.copytree(str(build_dir), str(dist_dir))
+        copied, removed = sync_tree(build_dir, dist_dir)
+        self.announce('  {:d} files updated, {:d} removed in {!s}'.format(
+            copied, removed, dist_dir), 2)
         return dist_dir
 
 
+class Lock(setuptools.Command):
+    """
+    Pin and hash every requirement into a single lock file.
+
+    Requirement files are read following their ``-r`` includes, then
+    resolved by *pip*, which downloads every distribution needed.  Each of
+    them is pinned in the lock file along with the hash of the downloaded
+    file, in the format expected by ``pip install --require-hashes``.
+    """
+
+    description = 'pin and hash requirements into a lock file'
+    user_options = [
+        ('requirements=', 'r', 'requirement file to lock'
+                               ' [default: requirements/dev.txt]'),
+        ('lock-file=', None, 'lock file to write'
+                             ' [default: {!s}]'.format(LOCK_FILE)),
+    ]
+
+    def initialize_options(self):
+        """Set default values for options."""
+        self.requirements = str(PROJECT_ROOT / 'requirements' / 'dev.txt')
+        self.lock_file = str(PROJECT_ROOT / LOCK_FILE)
+
+    def finalize_options(self):
+        """Post-process options."""
+        self.requirements = Path(self.requirements)
+        self.lock_file = Path(self.lock_file)
+
+    def run(self):
+        """Run command."""
+        import subprocess
+        import sys
+        import tempfile
+
+        requirements = resolve_requirement_files(self.requirements)
+        with tempfile.TemporaryDirectory() as work_dir:
+            flat_requirements = Path(work_dir) / 'requirements.txt'
+            flat_requirements.write_text('\n'.join(requirements) + '\n')
+            downloads = Path(work_dir) / 'downloads'
+            subprocess.check_call([sys.executable, '-m', 'pip', 'download',
+                                   '--quiet', '--dest', str(downloads),
+                                   '--requirement', str(flat_requirements)])
+            releases = {}
+            for path in sorted(downloads.iterdir()):
+                add_release(releases, path)
+
+        write_lock_file(self.lock_file, releases, self.requirements)
+        self.announce('Locked {:d} distributions in {!s}'.format(
+            len(releases), self.lock_file), 2)
+
+
+class Wheelhouse(setuptools.Command):
+    """
+    Provide a wheel of every locked distribution in a local directory.
+
+    Locked distributions are downloaded once, and those distributed as
+    source only are built into wheels.  Hashes of the built wheels are
+    added to the lock file.  Environments can then be provisioned
+    offline::
+
+        $ bin/python -m pip install --no-index --find-links wheelhouse \\
+              --requirement requirements.lock
+    """
+
+    description = 'download or build wheels of locked requirements'
+    user_options = [
+        ('lock-file=', None, 'lock file of the requirements'
+                             ' [default: {!s}]'.format(LOCK_FILE)),
+        ('wheelhouse=', 'w', 'directory to put wheels in'
+                             ' [default: {!s}]'.format(WHEELHOUSE)),
+    ]
+
+    def initialize_options(self):
+        """Set default values for options."""
+        self.lock_file = str(PROJECT_ROOT / LOCK_FILE)
+        self.wheelhouse = str(PROJECT_ROOT / WHEELHOUSE)
+
+    def finalize_options(self):
+        """Post-process options."""
+        self.lock_file = Path(self.lock_file)
+        self.wheelhouse = Path(self.wheelhouse)
+
+    def run(self):
+        """Run command."""
+        import subprocess
+        import sys
+
+        self.wheelhouse.mkdir(parents=True, exist_ok=True)
+        pip = [sys.executable, '-m', 'pip']
+        subprocess.check_call(pip + ['download', '--quiet', '--no-deps',
+                                     '--require-hashes',
+                                     '--find-links', str(self.wheelhouse),
+                                     '--dest', str(self.wheelhouse),
+                                     '--requirement', str(self.lock_file)])
+
+        sources = [str(path) for path in sorted(self.wheelhouse.iterdir())
+                   if path.is_file() and path.suffix != '.whl']
+        if sources:
+            subprocess.check_call(pip + ['wheel', '--quiet', '--no-deps',
+                                         '--no-index',
+                                         '--find-links', str(self.wheelhouse),
+                                         '--wheel-dir', str(self.wheelhouse)]
+                                  + sources)
+
+        releases, source = read_lock_file(self.lock_file)
+        for path in sorted(self.wheelhouse.glob('*.whl')):
+            add_release(releases, path, known_only=True)
+        write_lock_file(self.lock_file, releases, source)
+        self.announce('Wheels of {:d} distributions are in {!s}'.format(
+            len(releases), self.wheelhouse), 2)
+
+
+def resolve_requirement_files(path, seen=None) -> List[str]:
+    """
+    Read requirements of a file, following its ``-r`` includes.
+
+    :param path: Path to the requirement file
+    :param seen: Files already read, which are never read again
+    :return: A list of requirement lines, without duplicates
+    """
+    path = Path(str(path)).resolve()
+    seen = set() if seen is None else seen
+    if path in seen:
+        return []
+    seen.add(path)
+
+    requirements = []
+    for line in path.read_text().splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        for option in ('--requirement', '-r'):
+            if line.startswith(option):
+                included = line[len(option):].lstrip(' =')
+                requirements.extend(
+                    requirement for requirement in
+                    resolve_requirement_files(path.parent / included, seen)
+                    if requirement not in requirements)
+                break
+        else:
+            if line not in requirements:
+                requirements.append(line)
+    return requirements
+
+
+def canonical_name(name: str) -> str:
+    """Normalize a distribution name, as described by PEP 503."""
+    import re
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def add_release(releases, path, known_only=False):
+    """
+    Add the hash of a distribution file to the releases it belongs to.
+
+    :param releases: A mapping of canonical names to lists holding a
+                     version and a list of hashes, as read by
+                     :func:`read_lock_file`
+    :param path: Path to a wheel or a source distribution
+    :param known_only: Whether to ignore distributions missing from
+                       ``releases``
+    """
+    path = Path(str(path))
+    if path.suffix == '.whl':
+        name, version = path.name.split('-')[:2]
+    else:
+        stem = path.name
+        for extension in ('.tar.gz', '.tar.bz2', '.zip', '.tgz'):
+            if stem.endswith(extension):
+                stem = stem[:-len(extension)]
+        name, _, version = stem.rpartition('-')
+    name = canonical_name(name)
+    if known_only and name not in releases:
+        return
+
+    digest = 'sha256:{!s}'.format(
+        hashlib.sha256(path.read_bytes()).hexdigest())
+    release = releases.setdefault(name, [version, []])
+    if digest not in release[1]:
+        release[1].append(digest)
+
+
+def read_lock_file(path) -> tuple:
+    """
+    Read releases of a lock file, see :func:`add_release`.
+
+    :param path: Path to the lock file
+    :return: The releases, and the requirement file they were resolved
+             from or ``None``, as given to :func:`write_lock_file`
+    """
+    releases = {}
+    source = None
+    content = Path(str(path)).read_text().replace('\\\n', ' ')
+    for line in content.splitlines():
+        if line.startswith(LOCK_FILE_SOURCE):
+            source = PROJECT_ROOT / line[len(LOCK_FILE_SOURCE):].strip()
+        if not line.strip() or line.startswith('#'):
+            continue
+        requirement, *options = line.split()
+        name, _, version = requirement.partition('==')
+        releases[canonical_name(name)] = [
+            version, [option[len('--hash='):] for option in options
+                      if option.startswith('--hash=')]]
+    return releases, source
+
+
+def write_lock_file(path, releases, source=None):
+    """
+    Write releases to a lock file, see :func:`add_release`.
+
+    :param path: Path to the lock file
+    :param releases: The releases
+    :param source: Requirement file the releases were resolved from
+    """
+    lines = ['# Generated by "setup.py lock", do not edit']
+    if source is not None:
+        lines.append('{!s} {!s}'.format(
+            LOCK_FILE_SOURCE, os.path.relpath(str(source), str(PROJECT_ROOT))))
+    for name, (version, digests) in sorted(releases.items()):
+        lines.append(' \\\n    '.join(
+            ['{!s}=={!s}'.format(name, version)] +
+            ['--hash={!s}'.format(digest) for digest in sorted(digests)]))
+    Path(str(path)).write_text('\n'.join(lines) + '\n')
+
+
+def build_sphinx(sphinx_opts: List[str]):
+    """
+    Run Sphinx, in a function that can run in another process.
+
+    :param sphinx_opts: Command line arguments, as for ``sphinx-build``
+    """
+    import sphinx
+    return sphinx.build_main(sphinx_opts)
+
+
+def sync_tree(source, destination) -> tuple:
+    """
+    Make ``destination`` an exact copy of ``source``, copying little.
+
+    Files of the same size and modification time are considered
+    identical, as are files of the same size and content.  Only other
+    files are copied, along with their modification time.  Files and
+    directories absent from ``source`` are removed from ``destination``.
+
+    Files are copied rather than hard linked, since builders may rewrite
+    files of ``source`` in place.
+
+    :param source: Directory to copy files from
+    :param destination: Directory to copy files to
+    :return: Numbers of files copied and of paths removed
+    """
+    import shutil
+
+    copied = removed = 0
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        source_dir = os.path.join(str(source), relative)
+        destination_dir = os.path.join(str(destination), relative)
+        os.makedirs(destination_dir, exist_ok=True)
+
+        with os.scandir(destination_dir) as entries:
+            existing = {entry.name: entry for entry in entries}
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                current = existing.pop(entry.name, None)
+                if entry.is_dir():
+                    if current is not None and not current.is_dir():
+                        os.remove(current.path)
+                    pending.append(os.path.join(relative, entry.name))
+                    continue
+                if current is not None and current.is_dir():
+                    shutil.rmtree(current.path)
+                    current = None
+                if current is None or not same_file(entry, current):
+                    shutil.copy2(entry.path,
+                                 os.path.join(destination_dir, entry.name))
+                    copied += 1
+
+        for stale in existing.values():
+            if stale.is_dir(follow_symlinks=False):
+                shutil.rmtree(stale.path)
+            else:
+                os.remove(stale.path)
+            removed += 1
+    return copied, removed
+
+
+def same_file(source, destination) -> bool:
+    """
+    Tell whether two :func:`os.scandir` entries hold the same content.
+
+    Contents are compared only for files of the same size but different
+    modification times.  In that case, the modification time of
+    ``destination`` is updated so that it is not compared again.
+    """
+    import filecmp
+    import shutil
+
+    source_stat = source.stat()
+    destination_stat = destination.stat()
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+        return True
+    if not filecmp.cmp(source.path, destination.path, shallow=False):
+        return False
+    shutil.copystat(source.path, destination.path)
+    return True
+
+
 def compose(*functions):
     """
     Compose provided functions.
@@ -547,13 +1194,169 @@ def list_from_file(file_path: str) -> List[str]:
     return [line.strip() for line in content.splitlines() if line]
 
 
-def find_files(directory, pattern):
-    """Generate file names matching pattern recursively found in directory."""
-    for root, dirs, files in os.walk(directory):
-        for basename in files:
-            if fnmatch.fnmatch(basename, pattern):
-                filename = os.path.join(root, basename)
-                yield filename
+class PackageIndex(object):
+    """
+    Directories of a source tree, listed again only where they changed.
+
+    Adding or removing a directory changes the modification time of its
+    parent, so the subdirectories of a directory are stored along with its
+    modification time and reused as long as it is unchanged.  Hidden
+    directories, virtualenvs and those matching
+    :attr:`Clean.default_patterns` are never descended into.
+    """
+
+    def __init__(self, root, path=None):
+        """
+        Load the index of a source tree.
+
+        :param root: Root directory of the source tree
+        :param path: File in which the index is stored, if any
+        """
+        self.root = Path(str(root))
+        self.path = path
+        self._entries = {}
+        self._directories = None
+        if path is not None:
+            try:
+                self._entries = json.loads(read_file(path))
+            except (OSError, ValueError):
+                pass
+
+    def directories(self) -> List[tuple]:
+        """
+        List directories of the tree along with their modification time.
+
+        :return: A list of ``(relative_path, mtime)`` tuples, ``relative_path``
+                 being a posix path and ``''`` for the root directory
+        """
+        if self._directories is not None:
+            return self._directories
+
+        entries = {}
+        pending = ['']
+        while pending:
+            relative = pending.pop()
+            mtime = os.stat(str(self.root / relative)).st_mtime_ns
+            entry = self._entries.get(relative)
+            if entry is None or entry[0] != mtime:
+                entry = [mtime, self._list(relative)]
+            entries[relative] = entry
+            pending.extend(posixpath.join(relative, name)
+                           for name in reversed(entry[1]))
+
+        if entries != self._entries:
+            self._entries = entries
+            self.save()
+        self._directories = sorted((relative, entry[0])
+                                   for relative, entry in entries.items())
+        return self._directories
+
+    def packages(self, exclude=()) -> List[str]:
+        """
+        Find packages, including implicit namespace packages (PEP 420).
+
+        Every directory named as a python identifier is a package, unless
+        its dotted name matches a pattern in ``exclude``.
+
+        :param exclude: Glob patterns of packages to exclude
+        :return: A list of dotted package names
+        """
+        found = []
+        for relative, _ in self.directories():
+            if not relative:
+                continue
+            parts = relative.split('/')
+            name = '.'.join(parts)
+            if (all(part.isidentifier() for part in parts) and
+                    not any(fnmatch.fnmatch(name, pattern)
+                            for pattern in exclude)):
+                found.append(name)
+        return found
+
+    def save(self):
+        """Store the index, if it has a path."""
+        if self.path is None:
+            return
+        path = Path(str(self.path))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self._entries))
+        except OSError:
+            pass
+
+    def _list(self, relative):
+        names = []
+        with os.scandir(str(self.root / relative)) as entries:
+            for entry in entries:
+                if (entry.is_dir(follow_symlinks=False) and
+                        not self.is_pruned(entry.name) and
+                        not os.path.exists(os.path.join(entry.path,
+                                                        'pyvenv.cfg'))):
+                    names.append(entry.name)
+        return sorted(names)
+
+    @staticmethod
+    def is_pruned(name) -> bool:
+        """Tell whether a directory is never descended into, given its name."""
+        return name.startswith('.') or any(
+            fnmatch.fnmatch(name, pattern)
+            for pattern in Clean.default_patterns)
+
+
+def find_matching_paths(directory, patterns):
+    """
+    Generate paths of files and directories matching any of the patterns.
+
+    The tree is traversed once.  Matching directories, hidden directories
+    and virtualenvs are not descended into.
+
+    :param directory: Root of the tree
+    :param patterns: Glob patterns matched against base names
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if any(fnmatch.fnmatch(entry.name, pattern)
+                       for pattern in patterns):
+                    yield entry.path
+                elif (entry.is_dir(follow_symlinks=False) and
+                        not entry.name.startswith('.') and
+                        not os.path.exists(os.path.join(entry.path,
+                                                        'pyvenv.cfg'))):
+                    pending.append(entry.path)
+
+
+def disk_usage(path) -> int:
+    """Sum sizes of a file, or of all files in a directory, in bytes."""
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size
+    return sum(os.lstat(os.path.join(root, name)).st_size
+               for root, dirs, files in os.walk(path)
+               for name in files)
+
+
+def remove_path(path) -> int:
+    """
+    Remove a file or a directory and everything it holds.
+
+    Everything in a directory that can be removed is removed, even when
+    removing some of its content fails.
+
+    :return: Number of bytes reclaimed
+    :raise OSError: The first error met while removing ``path``
+    """
+    size = disk_usage(path)
+    if os.path.isdir(path) and not os.path.islink(path):
+        errors = []
+        shutil.rmtree(path, onerror=lambda function, name, exc_info:
+                      errors.append(exc_info[1]))
+        if errors:
+            raise errors[0]
+    else:
+        os.remove(path)
+    return size
 
 
 def main():
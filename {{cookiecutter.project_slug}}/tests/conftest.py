@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+# coding: utf8
+
+
+"""Options and fixtures shared by every test of `{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}`."""
+
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--benchmarks', action='store_true', default=False,
+                    dest='benchmarks',
+                    help='also assert wall clock timings of benchmarks, '
+                         'which depend on the machine they run on')
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmpdir_factory, monkeypatch):
+    """
+    Keep caches, such as the command index, out of the user's home.
+
+    :return: The directory used as ``XDG_CACHE_HOME``
+    """
+    cache_home = tmpdir_factory.mktemp('cache')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(cache_home))
+    return cache_home
@@ -6,7 +6,10 @@
 
 
 from click.testing import CliRunner
+import os
 import pytest
+import subprocess
+import sys
 
 from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import cli
 
@@ -59,3 +62,101 @@ def test_command_line_greet():
         'Hello World!',
     )
     assert all(x in result.output for x in expected)
+
+
+def test_command_line_help_imports_no_command(tmpdir):
+    """Once the command index is cached, *--help* imports no command."""
+    script = ('import sys\n'
+              'from {0!s} import cli\n'
+              'cli.main(["--help"], standalone_mode=False)\n'
+              'print("{0!s}.commands" in sys.modules)\n')
+    script = script.format(cli.__project__)
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmpdir))
+    outputs = [subprocess.check_output([sys.executable, '-c', script],
+                                       env=env, universal_newlines=True)
+               for _ in range(2)]
+    assert outputs[-1].splitlines()[-1] == 'False'
+
+
+def test_command_index_follows_command_changes(tmpdir, monkeypatch,
+                                               cache_home):
+    """
+    The cached short help follows changes to the command's module, and
+    replaces the index cached before them.
+    """
+    monkeypatch.syspath_prepend(str(tmpdir))
+    module = tmpdir.join('indexed_commands.py')
+    source = ('import click\n'
+              '@click.command()\n'
+              'def indexed():\n'
+              '    """{!s}"""\n')
+    commands = {'indexed': 'indexed_commands:indexed'}
+
+    module.write(source.format('First help.'))
+    assert cli.command_index(commands) == {'indexed': 'First help.'}
+    assert cli.command_index(commands) == {'indexed': 'First help.'}
+
+    module.write(source.format('Second help.'))
+    stat = module.stat()
+    os.utime(str(module), ns=(stat.atime_ns, stat.mtime_ns + 10 ** 9))
+    monkeypatch.delitem(sys.modules, 'indexed_commands')
+    assert cli.command_index(commands) == {'indexed': 'Second help.'}
+    assert len(cache_home.join(cli.__project__).listdir(
+        'commands-*.json')) == 1
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_command_line_greet_input(jobs: str):
+    """The sub-command *greet* greets every line of its input, in order."""
+    names = ['name{:d}'.format(number) for number in range(50)]
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['greet', '--formal', '--input', '-',
+                                      '--jobs', jobs],
+                           input='\n'.join(names) + '\n')
+    assert result.exit_code == 0
+    expected = ['Good evening {!s}'.format(name) for name in names]
+    assert result.output.splitlines()[-len(names):] == expected
+
+
+def test_command_line_greet_name_or_input():
+    """The sub-command *greet* refuses both a NAME and --input."""
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['greet', 'John', '--input', '-'],
+                           input='Jane\n')
+    assert result.exit_code == 2
+    assert 'mutually exclusive' in result.output
+
+
+@pytest.mark.parametrize('arguments, expected', [
+    (['--formal'], 'Good evening John'),
+    (['--slang'], 'Yo !!1 John!'),
+    (['--style', 'slang'], 'Yo !!1 John!'),
+    ([], 'Hello John!'),
+])
+def test_command_line_greet_style(arguments, expected):
+    """The sub-command *greet* greets in the chosen style."""
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['greet', 'John'] + arguments)
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1] == expected
+
+
+@pytest.mark.parametrize('arguments', [
+    ['--style', 'slang', '--formal'],
+    ['--formal', '--slang'],
+    ['--slang', '--style', 'nope'],
+])
+def test_command_line_greet_conflicting_styles(arguments):
+    """The sub-command *greet* refuses more than one style."""
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['greet', 'John'] + arguments)
+    assert result.exit_code == 2
+    assert 'Hello' not in result.output
+
+
+def test_command_line_greet_unknown_style():
+    """The sub-command *greet* refuses unknown styles."""
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ['greet', '--style', 'nope'])
+    assert result.exit_code != 0
+    assert 'no such style' in result.output
@@ -7,7 +7,7 @@
 
 import pytest
 
-from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import web
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import greetings, web
 
 
 @pytest.fixture
@@ -52,6 +52,17 @@ def test_web_get_greetings_with_name_and_slang_style(client):
         'greetings responded as expected'
 
 
+def test_web_greetings_have_their_own_cache():
+    app = web.create_app(cache_size=8)
+    client = app.test_client()
+    for _ in range(3):
+        rv = client.get('/greetings/John?style=formal')
+        assert 'Good evening John' in rv.data.decode()
+    cache = app.extensions['greetings_cache']
+    assert (2, 1) == tuple(cache.info())[:2]
+    assert greetings.cache_info() is None
+
+
 {% if cookiecutter.make_rest_api == 'y' -%}
 def test_api_get(client):
     rv = client.get('/api/myresource/')
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+# coding: utf8
+
+
+"""
+Micro-benchmark of the `{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}.greetings` batch API.
+
+Greeting a batch of names with :func:`greetings.render_lines` must be
+faster than building one :class:`greetings.Greetings` object per name.
+Timings are the best of a few repeats, to dampen noise.
+
+Timings depend on the machine and its load, so they are only measured
+when asked for, while both paths are always checked to agree::
+
+    $ python -m pytest tests/regression --benchmarks
+"""
+
+
+import timeit
+
+import pytest
+
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import greetings
+
+
+NAMES = ['name{:d}'.format(number) for number in range(10000)]
+
+
+def best_time(function) -> float:
+    """Provide the best time of a few repeats of a function, in seconds."""
+    return min(timeit.repeat(function, number=5, repeat=5))
+
+
+@pytest.mark.parametrize('greeting', [greetings.Greetings,
+                                      greetings.Formal,
+                                      greetings.Slang])
+def test_render_lines_beats_objects(request, greeting):
+    """The batch API is faster than the per-object path, for every style."""
+    def per_object():
+        return ''.join('{!s}\n'.format(greeting(name)) for name in NAMES)
+
+    def batch():
+        return greetings.render_lines(NAMES, greeting.style)
+
+    assert batch() == per_object()
+    if not request.config.option.benchmarks:
+        pytest.skip('measuring timings requires --benchmarks')
+    per_object_time = best_time(per_object)
+    batch_time = best_time(batch)
+    print('{!s}: {:.2f}x faster'.format(greeting.__name__,
+                                        per_object_time / batch_time))
+    assert batch_time < per_object_time
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+# coding: utf8
+
+
+"""
+Import time budget of the `{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}` package.
+
+Modules are imported in fresh interpreters, run with ``-X importtime``,
+and their cumulative import time is compared to the budget stored in
+``import_budget.json`` (in microseconds).  Cold start of the command line
+(``--help``) is compared to the same budget file.  Timings are the best of
+a few runs, to dampen noise.
+
+Raise a budget deliberately, in the same change adding a heavy import.
+"""
+
+
+from pathlib import Path
+import json
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __project__
+
+
+BUDGET = json.loads(
+    (Path(__file__).parent / 'import_budget.json').read_text())
+
+ROUNDS = 3
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 7),
+                                reason='-X importtime requires python 3.7')
+
+
+def import_times(*args) -> dict:
+    """
+    Run a fresh interpreter with ``-X importtime``.
+
+    :param args: Arguments given to the interpreter after ``-X importtime``
+    :return: A mapping of module names to cumulative import times, in
+             microseconds
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime'] +
+                             list(args),
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def best_import_time(module: str) -> int:
+    """Provide the best cumulative import time of a module, over rounds."""
+    samples = [import_times('-c', 'import {!s}'.format(module)).get(module)
+               for _ in range(ROUNDS)]
+    assert None not in samples, '{!s} was not imported'.format(module)
+    return min(samples)
+
+
+@pytest.mark.parametrize('name', sorted(BUDGET['modules']))
+def test_module_import_time(name):
+    """Importing each module stays within its budget."""
+    module = __project__ if name == '__init__' else '.'.join([__project__,
+                                                              name])
+    try:
+        __import__(module)
+    except ImportError:
+        pytest.skip('{!s} is not part of this project'.format(module))
+    spent = best_import_time(module)
+    assert spent <= BUDGET['modules'][name], (
+        '{!s} took {:d}us to import, budget is {:d}us'.format(
+            module, spent, BUDGET['modules'][name]))
+
+
+def test_package_import_is_not_heavy():
+    """Running the package imports none of the known heavy modules."""
+    times = import_times('-m', __project__, '--help')
+    assert __project__ in times
+    assert 'pkg_resources' not in times
+
+
+@pytest.mark.parametrize('command', [
+    [sys.executable, '-m', __project__],
+    [shutil.which(__project__)],
+], ids=['module', 'console_script'])
+def test_command_line_help_time(command):
+    """Cold start of the command line stays within its budget."""
+    if None in command:
+        pytest.skip('The console script is not installed')
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        subprocess.check_call(command + ['--help'],
+                              stdout=subprocess.DEVNULL)
+        samples.append(int((time.perf_counter() - start) * 1e6))
+    spent = min(samples)
+    assert spent <= BUDGET['commands']['--help'], (
+        '{!s} --help took {:d}us, budget is {:d}us'.format(
+            ' '.join(command), spent, BUDGET['commands']['--help']))
@@ -5,12 +5,113 @@
 """Unit tests for the `{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}.greetings` module."""
 
 
+from collections import namedtuple
+import importlib.metadata
+
+import pytest
+
 from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import greetings
 
 
+@pytest.fixture
+def styles_registry(monkeypatch):
+    """Let tests register styles, and discover plugins again."""
+    monkeypatch.setattr(greetings, '_STYLES', dict(greetings._STYLES))
+    monkeypatch.setattr(greetings, '_plugins_loaded', False)
+    return greetings._STYLES
+
+
+class FakeEntryPoint(namedtuple('FakeEntryPoint', 'name value')):
+
+    def load(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+class FakeEntryPoints(object):
+
+    def __init__(self, group, entry_points):
+        self.group = group
+        self.entry_points = entry_points
+        self.lookups = 0
+
+    def __call__(self):
+        self.lookups += 1
+        return self
+
+    def select(self, group):
+        return self.entry_points if group == self.group else []
+
+
 def test_formal():
     assert 'Good evening John' == str(greetings.Formal('John'))
 
 
 def test_slang():
     assert 'Yo !!1 John!' == str(greetings.Slang('John'))
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = greetings.RenderCache(maxsize=2)
+    cache.render('John', 'formal')
+    cache.render('Jane', 'slang')
+    assert 'Good evening John' == cache.render('John', 'formal')
+    cache.render('Jack')
+    assert (1, 3, 1, 2, 2) == tuple(cache.info())
+    assert 'Yo !!1 Jane!' == cache.render('Jane', 'slang')
+    assert 2 == cache.info().evictions
+
+
+def test_render_uses_enabled_cache():
+    cache = greetings.enable_cache(8)
+    try:
+        assert 'Hello John!' == greetings.render('John')
+        assert 'Hello John!' == greetings.render('John')
+        assert cache.info() == greetings.cache_info()
+        assert (1, 1) == tuple(greetings.cache_info())[:2]
+    finally:
+        greetings.disable_cache()
+    assert greetings.cache_info() is None
+
+
+def test_styles_include_plugins(styles_registry):
+    styles_registry['warm'] = greetings.compile_style('warm',
+                                                      'Welcome home, {!s}')
+    assert 'warm' in greetings.styles()
+    assert 'Welcome home, John' == greetings.render('John', 'warm')
+    assert 'Hello John!' == greetings.render('John', 'no such style')
+
+
+def test_compile_style_accepts_callables():
+    style = greetings.compile_style('shout', lambda name: name.upper())
+    assert 'JOHN\n' == style.render_line('John')
+
+
+def test_styles_are_discovered_from_entry_points(styles_registry,
+                                                 monkeypatch):
+    class Polite(greetings.Greetings):
+        template = 'Dear {!s},'
+
+    fake_entry_points = FakeEntryPoints(greetings.STYLES_GROUP, [
+        FakeEntryPoint('warm', 'Welcome home, {!s}'),
+        FakeEntryPoint('polite', Polite),
+        FakeEntryPoint('shout', lambda name: name.upper()),
+        FakeEntryPoint('broken', ImportError('no module named broken')),
+        FakeEntryPoint('formal', 'Hey {!s}'),
+    ])
+    monkeypatch.setattr(importlib.metadata, 'entry_points', fake_entry_points)
+
+    with pytest.warns(UserWarning, match='broken'):
+        found = greetings.styles()
+    assert {'warm', 'polite', 'shout'} <= set(found)
+    assert 'broken' not in found
+    assert 'Welcome home, John' == greetings.render('John', 'warm')
+    assert 'Dear John,' == greetings.render('John', 'polite')
+    assert 'JOHN\n' == greetings.render_lines(['John'], 'shout')
+    assert 'Good evening John' == greetings.render('John', 'formal')
+
+    assert 'Hello John!' == greetings.render('John', 'broken')
+    with pytest.raises(KeyError):
+        greetings.get_style('broken')
+    assert 1 == fake_entry_points.lookups
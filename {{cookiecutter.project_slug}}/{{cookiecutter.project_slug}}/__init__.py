@@ -5,24 +5,36 @@
 """Package main definition."""
 
 
-from pkg_resources import get_distribution, DistributionNotFound
+__all__ = (
+    '__project__',
+    '__version__',
+)
 
 
-__project__ = '{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}'
-__version__ = None  # required for initial installation
-
 try:
-    distribution = get_distribution(__project__)
-    __version__ = distribution.version
-
-except DistributionNotFound:
-    # This will happen if the package is not installed.
-    # For more informations about development installation, read about
-    # the 'develop' setup.py command or the '--editable' pip option.
-    # Note that development installations may break other packages from
-    # the same implicit namespace
+    # Written by setup.py when building the package
+    from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}._metadata import project as __project__
+    from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}._metadata import version as __version__
+except ImportError:
+    # This will happen if the package is not built, as for development
+    # installations.  For more informations about development installation,
+    # read about the 'develop' setup.py command or the '--editable' pip
+    # option.  Note that development installations may break other packages
+    # from the same implicit namespace
     # (see https://github.com/pypa/packaging-problems/issues/12)
-    __version__ = '(local)'
-else:
-    pass
-    # make shortcut import here
+    __project__ = '{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}'
+
+    def __getattr__(name):
+        """Look up the version of the installed distribution, lazily."""
+        if name != '__version__':
+            raise AttributeError('module {!r} has no attribute {!r}'.format(
+                __name__, name))
+        from importlib.metadata import version, PackageNotFoundError
+
+        global __version__
+        try:
+            __version__ = version(__project__)
+        except PackageNotFoundError:
+            # This will happen if the package is not installed.
+            __version__ = '(local)'
+        return __version__
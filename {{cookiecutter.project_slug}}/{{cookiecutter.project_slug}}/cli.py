@@ -2,16 +2,177 @@
 # coding: utf8
 
 
-"""Command line interface for {{ cookiecutter.project_name }}."""
+"""
+Command line interface for {{ cookiecutter.project_name }}.
 
+Sub-commands are declared in :data:`COMMANDS`, which ``setup.py``
+registers as entry points (see ``ProjectMetadata.commands``), and their
+modules are only imported when they run.  Their short help is kept in a
+cached command index, so that ``--help`` is rendered without importing
+any of them.
+"""
+
+
+from pathlib import Path
+import hashlib
+import importlib
+import json
+import os
 
 import click
 
-from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __project__, __version__, greetings
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __project__
+
+
+COMMANDS_GROUP = '{!s}.commands'.format(__project__)
+
+# Import paths relative to this package.  setup.py reads this literal
+# without importing this module, and registers these commands as entry
+# points, which are looked up instead once the package is installed.
+COMMANDS = {
+    'greet': '.commands:greet',
+}
+
+
+def registered_commands() -> dict:
+    """
+    Find sub-commands without importing them.
+
+    :return: A mapping of command names to import paths
+    """
+    try:
+        from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}._metadata import entry_points
+    except ImportError:
+        # Editable checkouts are not built, ask the installed distribution
+        from importlib.metadata import distribution, PackageNotFoundError
+        try:
+            entry_points = {}
+            for entry_point in distribution(__project__).entry_points:
+                entry_points.setdefault(entry_point.group, []).append(
+                    '{!s}={!s}'.format(entry_point.name, entry_point.value))
+        except PackageNotFoundError:
+            # A source checkout that was never installed
+            return {name: __project__ + import_path
+                    for name, import_path in COMMANDS.items()}
+
+    commands = {}
+    for specification in entry_points.get(COMMANDS_GROUP, []):
+        name, _, import_path = specification.partition('=')
+        commands[name.strip()] = import_path.strip()
+    return commands
+
+
+def load_command(import_path: str) -> click.Command:
+    """Import a command given its ``module:attribute`` path."""
+    module_name, _, attribute = import_path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def command_index(commands: dict) -> dict:
+    """
+    Provide the short help of every command, from a cache if possible.
+
+    The cache is keyed by the commands' import paths, the version of the
+    distribution and the modification times of the commands' modules, so
+    that it is built again, by importing every command, whenever any of
+    them changes.  Modules are found without being imported, and indexes
+    built for other keys are removed once a new one is written.
+
+    :param commands: A mapping of command names to import paths
+    :return: A mapping of command names to short help
+    """
+    from importlib.util import find_spec
+    from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __version__
 
+    key = hashlib.sha256(json.dumps(commands, sort_keys=True).encode())
+    key.update(str(__version__).encode())
+    for module_name in sorted({import_path.partition(':')[0]
+                               for import_path in commands.values()}):
+        try:
+            origin = find_spec(module_name).origin
+            mtime = os.stat(origin).st_mtime_ns
+        except (ImportError, AttributeError, TypeError, OSError):
+            mtime = None
+        key.update('{!s}:{!s}'.format(module_name, mtime).encode())
+    cache_path = (Path(os.getenv('XDG_CACHE_HOME',
+                                 os.path.expanduser('~/.cache'))) /
+                  __project__ / 'commands-{!s}.json'.format(
+                      key.hexdigest()[:16]))
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        pass
 
-@click.group(__project__)
-@click.version_option(version=__version__)
+    index = {name: load_command(import_path).get_short_help_str()
+             for name, import_path in commands.items()}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(index))
+        for stale_path in cache_path.parent.glob('commands-*.json'):
+            if stale_path != cache_path:
+                stale_path.unlink()
+    except OSError:
+        pass
+    return index
+
+
+class LazyGroup(click.Group):
+    """A command group importing a sub-command only when it runs."""
+
+    def __init__(self, *args, registry=registered_commands, **kwargs):
+        """
+        Create the group.
+
+        :param registry: A callable providing a mapping of command names to
+                         import paths
+        """
+        super().__init__(*args, **kwargs)
+        self._registry = registry
+        self._lazy_commands = None
+
+    @property
+    def lazy_commands(self) -> dict:
+        """Provide registered commands, looked up on first use."""
+        if self._lazy_commands is None:
+            self._lazy_commands = self._registry()
+        return self._lazy_commands
+
+    def list_commands(self, ctx):
+        """List eager and lazy commands."""
+        return sorted(set(super().list_commands(ctx)) |
+                      set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        """Provide a command, importing it if needed."""
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in self.lazy_commands:
+            command = load_command(self.lazy_commands[cmd_name])
+            self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(self, ctx, formatter):
+        """Write the commands' short help, without importing them."""
+        index = command_index(self.lazy_commands)
+        index.update((name, command.get_short_help_str())
+                     for name, command in self.commands.items())
+        if index:
+            with formatter.section('Commands'):
+                formatter.write_dl(sorted(index.items()))
+
+
+def print_version(ctx, param, value):
+    """Print the version, which is looked up only when asked for."""
+    if not value or ctx.resilient_parsing:
+        return
+    from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __version__
+    click.echo('{!s}, version {!s}'.format(ctx.find_root().info_name,
+                                           __version__))
+    ctx.exit()
+
+
+@click.group(__project__, cls=LazyGroup)
+@click.option('--version', is_flag=True, expose_value=False, is_eager=True,
+              callback=print_version, help='Show the version and exit.')
 def main():
     """Console script for {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}."""
     click.echo('Replace this message by putting your code into '
@@ -19,19 +180,5 @@ def main():
     click.echo('See click documentation at http://click.pocoo.org/')
 
 
-@main.command()
-@click.argument('name', default='World')
-@click.option('--formal', is_flag=True, default=False)
-@click.option('--slang', is_flag=True, default=False)
-def greet(name, formal, slang):
-    """Command line greeter."""
-    if formal:
-        click.echo(greetings.Formal(name))
-    elif slang:
-        click.echo(greetings.Slang(name))
-    else:
-        click.echo(greetings.Greetings(name))
-
-
 if __name__ == '__main__':
     main(prog_name=__project__)
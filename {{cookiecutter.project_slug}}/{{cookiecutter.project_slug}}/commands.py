@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# coding: utf8
+
+
+"""
+Sub-commands of the command line interface.
+
+This module is only imported when one of its commands runs, see
+:class:`{% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %}.cli.LazyGroup`.
+"""
+
+
+from collections import deque
+import itertools
+
+import click
+
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import greetings
+
+
+CHUNK_SIZE = 10000
+"""Number of names greeted at once in bulk mode."""
+
+
+def validate_style(ctx, param, value):
+    """Make sure a greeting style exists."""
+    if value is None:
+        return value
+    try:
+        greetings.get_style(value)
+    except KeyError:
+        raise click.BadParameter('no such style, choose from {!s}'.format(
+            ', '.join(sorted(greetings.styles()))))
+    return value
+
+
+@click.command()
+@click.argument('name', required=False)
+@click.option('--style', default=None, callback=validate_style,
+              help='Greeting style, built-in or provided by a plugin '
+                   '[default: {!s}].'.format(greetings.DEFAULT_STYLE))
+@click.option('--formal', is_flag=True,
+              help='Same as --style={!s}.'.format(greetings.Formal.style))
+@click.option('--slang', is_flag=True,
+              help='Same as --style={!s}.'.format(greetings.Slang.style))
+@click.option('--input', 'input_file', type=click.File('rb'), default=None,
+              help='Greet every name of this file, one per line '
+                   '(- for standard input), instead of NAME.')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              help='Number of processes greeting names from --input.')
+@click.option('--cache-size', type=click.IntRange(min=0), default=0,
+              help='Number of greetings to cache, none by default.')
+def greet(name, style, formal, slang, input_file, jobs, cache_size):
+    """
+    Command line greeter.
+
+    Greet NAME, World by default, or every name of the --input file.
+    """
+    if name is not None and input_file is not None:
+        raise click.UsageError('NAME and --input are mutually exclusive.')
+    chosen = [value for value, given in ((style, style is not None),
+                                         (greetings.Formal.style, formal),
+                                         (greetings.Slang.style, slang))
+              if given]
+    if len(chosen) > 1:
+        raise click.UsageError(
+            '--style, --formal and --slang are mutually exclusive.')
+    style = chosen[0] if chosen else greetings.DEFAULT_STYLE
+
+    if cache_size:
+        greetings.enable_cache(cache_size)
+
+    if input_file is None:
+        click.echo(greetings.render('World' if name is None else name,
+                                    style))
+        return
+
+    with click.open_file('-', 'wb') as output:
+        for chunk in greet_stream(style, input_file, jobs):
+            output.write(chunk)
+
+
+def greet_stream(style, lines, jobs: int = 1, chunk_size: int = CHUNK_SIZE):
+    """
+    Greet names streamed line by line, at constant memory.
+
+    Names are greeted by chunks, each of which is written at once.  With
+    more than one job, chunks are greeted by a pool of processes and only a
+    few of them are pending at any time.  Output order is always that of
+    the input.
+
+    :param style: Name of the greeting style
+    :param lines: An iterable of names, as lines of bytes
+    :param jobs: Number of processes greeting names
+    :param chunk_size: Number of names greeted at once
+    :return: An iterator of greetings, as chunks of bytes
+    """
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    if jobs == 1:
+        yield from (greet_chunk(style, chunk) for chunk in chunks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(greet_chunk, style, chunk))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def greet_chunk(style, lines) -> bytes:
+    """
+    Greet a chunk of names.
+
+    :param style: Name of the greeting style
+    :param lines: Names, as lines of bytes
+    :return: One greeting per non blank line, as bytes
+    """
+    names = (line.decode('utf-8').rstrip('\r\n') for line in lines)
+    return greetings.render_lines(
+        (name for name in names if name.strip()), style).encode('utf-8')
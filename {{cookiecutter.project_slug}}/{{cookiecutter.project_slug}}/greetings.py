@@ -5,6 +5,20 @@
 """Cookiecutter template tests."""
 
 
+from collections import OrderedDict, namedtuple
+from typing import Iterable, Iterator
+import threading
+import warnings
+
+from {% if cookiecutter.namespace %}{{ cookiecutter.namespace }}.{{ cookiecutter.project_slug }}{% else %}{{ cookiecutter.project_slug }}{% endif %} import __project__
+
+
+DEFAULT_STYLE = 'default'
+
+STYLES_GROUP = '{!s}.styles'.format(__project__)
+"""Entry point group of plugin styles, see :func:`styles`."""
+
+
 class Greetings(object):
     """
     Wraps a name into a greeting.
@@ -16,6 +30,11 @@ class Greetings(object):
 
     """
 
+    __slots__ = ('_name',)
+
+    style = DEFAULT_STYLE
+    template = 'Hello {!s}!'
+
     def __init__(self, name: str):
         """
         Trivial constructor.
@@ -26,20 +45,289 @@ class Greetings(object):
 
     def __str__(self):
         """Provide a string representation of a normal greeting."""
-        return 'Hello {!s}!'.format(self._name)
+        return self.template.format(self._name)
 
 
 class Formal(Greetings):
     """A more formal greeter."""
 
-    def __str__(self):
-        """Provide a string representation of a formal greeting."""
-        return 'Good evening {!s}'.format(self._name)
+    __slots__ = ()
+
+    style = 'formal'
+    template = 'Good evening {!s}'
 
 
 class Slang(Greetings):
     """A rude greeter."""
 
-    def __str__(self):
-        """Provide a string representation of a slang greeting."""
-        return 'Yo !!1 {!s}!'.format(self._name)
+    __slots__ = ()
+
+    style = 'slang'
+    template = 'Yo !!1 {!s}!'
+
+
+Style = namedtuple('Style', 'name render render_line')
+"""
+A greeting style, with precompiled renderers.
+
+``render`` greets a name and ``render_line`` does the same, followed by a
+newline.
+"""
+
+
+def compile_style(name: str, definition) -> Style:
+    """
+    Precompile a greeting style.
+
+    Here is an example usage::
+
+        >>> compile_style('warm', 'Welcome home, {!s}').render('Charles')
+        'Welcome home, Charles'
+
+    :param name: Name of the style
+    :param definition: Either a template formatting a name (such as
+                       ``'Hi {!s}'``), an object with such a ``template``
+                       attribute (such as a :class:`Greetings` class) or a
+                       callable greeting a name
+    """
+    template = getattr(definition, 'template', definition)
+    if isinstance(template, str):
+        return Style(name, template.format, (template + '\n').format)
+    if callable(definition):
+        return Style(name, definition,
+                     lambda greeted: definition(greeted) + '\n')
+    raise TypeError('Cannot make a greeting style of {!r}'.format(
+        definition))
+
+
+# Styles by name, built-ins first and plugins once discovered
+_STYLES = {greeting.style: compile_style(greeting.style, greeting)
+           for greeting in (Greetings, Formal, Slang)}
+_plugins_lock = threading.Lock()
+_plugins_loaded = False
+
+
+def _load_plugins():
+    """Add styles registered as entry points, once."""
+    global _plugins_loaded
+    with _plugins_lock:
+        if _plugins_loaded:
+            return
+        from importlib.metadata import entry_points
+
+        found = entry_points()
+        if hasattr(found, 'select'):
+            found = found.select(group=STYLES_GROUP)
+        else:
+            found = found.get(STYLES_GROUP, [])
+        for entry_point in found:
+            if entry_point.name in _STYLES:
+                continue
+            try:
+                _STYLES[entry_point.name] = compile_style(entry_point.name,
+                                                          entry_point.load())
+            except Exception as error:
+                warnings.warn('Ignoring greeting style {!r}: {!s}'.format(
+                    entry_point.name, error))
+        _plugins_loaded = True
+
+
+def styles() -> dict:
+    """
+    Provide every greeting style.
+
+    Besides built-in styles, other distributions may provide styles by
+    registering, in the entry point group named after :data:`STYLES_GROUP`,
+    anything :func:`compile_style` accepts.  Plugins never override
+    built-in styles.  They are discovered once, the first time a style
+    that is not built-in is looked up.
+
+    :return: A mapping of style names to :class:`Style`
+    """
+    _load_plugins()
+    return dict(_STYLES)
+
+
+def get_style(name: str) -> Style:
+    """
+    Look up a greeting style.
+
+    :raise KeyError: When no such style exists
+    """
+    try:
+        return _STYLES[name]
+    except KeyError:
+        if _plugins_loaded:
+            raise
+    _load_plugins()
+    return _STYLES[name]
+
+
+def _style(name):
+    """Look up a greeting style, the default one if it does not exist."""
+    try:
+        return get_style(name)
+    except KeyError:
+        return _STYLES[DEFAULT_STYLE]
+
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions size maxsize')
+"""Statistics of a :class:`RenderCache`."""
+
+
+class RenderCache(object):
+    """
+    A bounded and thread-safe cache of greetings, keyed by style and name.
+
+    The least recently used greetings are evicted first.  Here is an example
+    usage::
+
+        >>> cache = RenderCache(maxsize=1)
+        >>> cache.render('Alice', 'formal')
+        'Good evening Alice'
+        >>> cache.render('Alice', 'formal')
+        'Good evening Alice'
+        >>> cache.render('Bob', 'formal')
+        'Good evening Bob'
+        >>> cache.info()
+        CacheInfo(hits=1, misses=2, evictions=1, size=1, maxsize=1)
+
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Create an empty cache.
+
+        :param maxsize: Maximum number of greetings held
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive, got {!r}'.format(
+                maxsize))
+        self.maxsize = maxsize
+        self._greetings = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def render(self, name: str, style: str = DEFAULT_STYLE) -> str:
+        """Greet a name in a style, rendering it only if not cached."""
+        key = (style, name)
+        with self._lock:
+            try:
+                greeting = self._greetings[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._greetings.move_to_end(key)
+                self._hits += 1
+                return greeting
+
+        greeting = _style(style).render(name)
+        with self._lock:
+            self._greetings[key] = greeting
+            while len(self._greetings) > self.maxsize:
+                self._greetings.popitem(last=False)
+                self._evictions += 1
+        return greeting
+
+    def info(self) -> CacheInfo:
+        """Provide hit, miss and eviction counters of this cache."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             len(self._greetings), self.maxsize)
+
+    def clear(self):
+        """Forget every greeting and reset counters."""
+        with self._lock:
+            self._greetings.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+# The cache shared by every caller of render(), if enabled
+_cache = None
+
+
+def enable_cache(maxsize: int = 1024) -> RenderCache:
+    """
+    Cache greetings rendered by :func:`render`, which is opt-in.
+
+    This cache is global to the process: every caller of :func:`render`
+    shares it.  Use a :class:`RenderCache` of your own to cache greetings
+    of a single component.
+
+    :param maxsize: Maximum number of greetings held
+    :return: The cache, replacing any previously enabled one
+    """
+    global _cache
+    _cache = RenderCache(maxsize)
+    return _cache
+
+
+def disable_cache():
+    """Stop caching greetings rendered by :func:`render`."""
+    global _cache
+    _cache = None
+
+
+def cache_info() -> CacheInfo:
+    """Provide statistics of the enabled cache, ``None`` if disabled."""
+    cache = _cache
+    return None if cache is None else cache.info()
+
+
+def render(name: str, style: str = DEFAULT_STYLE) -> str:
+    """
+    Greet a name in a style, without building any object.
+
+    Unknown styles are rendered as normal greetings::
+
+        >>> render('Charles', 'formal')
+        'Good evening Charles'
+
+    Greetings are cached, if enabled (see :func:`enable_cache`).
+
+    :param name: The name of whom to be greeted
+    :param style: Name of the greeting style
+    """
+    cache = _cache
+    if cache is not None:
+        return cache.render(name, style)
+    return _style(style).render(name)
+
+
+def render_many(names: Iterable[str],
+                style: str = DEFAULT_STYLE) -> Iterator[str]:
+    """
+    Greet many names in the same style.
+
+    Here is an example usage::
+
+        >>> list(render_many(['Alice', 'Bob'], 'formal'))
+        ['Good evening Alice', 'Good evening Bob']
+
+    :param names: The names of whom to be greeted
+    :param style: Name of the greeting style
+    :return: An iterator of greetings
+    """
+    return map(_style(style).render, names)
+
+
+def render_lines(names: Iterable[str], style: str = DEFAULT_STYLE) -> str:
+    """
+    Greet many names in the same style, into a single string.
+
+    Here is an example usage::
+
+        >>> print(render_lines(['Alice', 'Bob'], 'slang'), end='')
+        Yo !!1 Alice!
+        Yo !!1 Bob!
+
+    Greetings are cached, if enabled (see :func:`enable_cache`).
+
+    :param names: The names of whom to be greeted
+    :param style: Name of the greeting style
+    :return: One greeting per line, each ending with a newline
+    """
+    cache = _cache
+    if cache is not None:
+        return ''.join(cache.render(name, style) + '\n' for name in names)
+    return ''.join(map(_style(style).render_line, names))
@@ -4,7 +4,9 @@
 
 """Cookiecutter template tests."""
 
-from flask import Blueprint, Flask, request
+from typing import Optional
+
+from flask import Blueprint, Flask, current_app, request
 {% if cookiecutter.make_rest_api == 'y' -%}
 from flask_ripozo import FlaskDispatcher
 from ripozo.adapters import HalAdapter, SirenAdapter
@@ -28,16 +30,11 @@ def root_view():
 @{{ cookiecutter.project_slug }}.route('/greetings/<person>')
 def greetings_view(person='World!'):
     """Provide the greeting resource."""
-    style = request.args.get('style', None)
-
-    if style == 'slang':
-        message = str(greetings.Slang(person))
-    elif style == 'formal':
-        message = str(greetings.Formal(person))
-    else:
-        message = str(greetings.Greetings(person))
-
-    return message
+    style = request.args.get('style', greetings.DEFAULT_STYLE)
+    cache = current_app.extensions.get('greetings_cache')
+    if cache is not None:
+        return cache.render(person, style)
+    return greetings.render(person, style)
 
 
 {% if cookiecutter.make_rest_api == 'y' -%}
@@ -65,10 +62,20 @@ class HelloWorldViewset(ResourceBase):
         return cls(properties=faked_response_properties, status_code=202)
 
 
-def create_app():
-    """Create a new Flask web application and returns it."""
+def create_app(cache_size: Optional[int] = None):
+    """
+    Create a new Flask web application and returns it.
+
+    Each application has its own cache of greetings, so that creating one
+    never changes how others, or the rest of the process, greet.
+
+    :param cache_size: Number of greetings to cache, if any (see
+                       :class:`greetings.RenderCache`)
+    """
     # Create the flask application
     app = Flask(__name__)
+    app.extensions['greetings_cache'] = (
+        greetings.RenderCache(cache_size) if cache_size else None)
     api_blueprint = Blueprint('hello_api', __name__)
 
     # Create the dispatcher
@@ -88,9 +95,19 @@ def create_app():
 
     return app
 {% else -%}
-def create_app():
-    """Create a new Flask web application and returns it."""
+def create_app(cache_size: Optional[int] = None):
+    """
+    Create a new Flask web application and returns it.
+
+    Each application has its own cache of greetings, so that creating one
+    never changes how others, or the rest of the process, greet.
+
+    :param cache_size: Number of greetings to cache, if any (see
+                       :class:`greetings.RenderCache`)
+    """
     app = Flask(__name__)
+    app.extensions['greetings_cache'] = (
+        greetings.RenderCache(cache_size) if cache_size else None)
     for blueprint in all_blueprints:
         app.register_blueprint(blueprint)
     return app